@@ -23,6 +23,9 @@ const char* PC_IP    = "10.239.67.147"; // Make sure this is your PC's CURRENT I
 #define I2S_SPK_DIN 22
 #define I2S_SPK_NUM I2S_NUM_1
 #define BUFFER_LEN 512
+#define SPK_HEADER_LEN 8      // "AE" magic, uint16 seq, uint32 sample position (little endian)
+#define SPK_MAX_PAYLOAD 1024
+#define SPK_STREAM_GAP_MS 500 // silence longer than this starts a new stream
 
 WiFiUDP udp_mic;
 WiFiUDP udp_spk;
@@ -30,7 +33,14 @@ WiFiUDP udp_smoke;
 
 int32_t raw_samples[BUFFER_LEN];
 int16_t tx_samples[BUFFER_LEN];
-uint8_t rx_buffer[1024];
+uint8_t rx_buffer[SPK_HEADER_LEN + SPK_MAX_PAYLOAD];
+
+// Speaker packet stats
+uint16_t spk_expected_seq = 0;
+bool spk_in_stream = false;
+unsigned long spk_last_rx = 0;
+uint32_t spk_lost = 0;
+uint32_t spk_dropped_late = 0;
 
 void micTask(void* parameter) {
   Serial.println("🎤 Mic Task Started on Core 0");
@@ -89,9 +99,28 @@ void spkTask(void* parameter) {
     
     if (packetSize > 0) {
       int len = udp_spk.read(rx_buffer, sizeof(rx_buffer));
-      if (len > 0) {
+      uint8_t* payload = rx_buffer;
+      bool play = len > 0;
+
+      if (len >= SPK_HEADER_LEN && rx_buffer[0] == 'A' && rx_buffer[1] == 'E') {
+        uint16_t seq = rx_buffer[2] | (rx_buffer[3] << 8);
+        unsigned long now = millis();
+        if (!spk_in_stream || now - spk_last_rx > SPK_STREAM_GAP_MS) {
+          spk_in_stream = true;  // new utterance: accept whatever sequence it starts at
+        } else {
+          int16_t delta = (int16_t)(seq - spk_expected_seq);
+          if (delta < 0) { spk_dropped_late++; play = false; }  // duplicate or arrived after its successor
+          else if (delta > 0) spk_lost += delta;
+        }
+        if (play) spk_expected_seq = seq + 1;
+        spk_last_rx = now;
+        payload += SPK_HEADER_LEN;
+        len -= SPK_HEADER_LEN;
+      }
+
+      if (play && len > 0) {
         size_t written;
-        i2s_write(I2S_SPK_NUM, rx_buffer, len, &written, 100);
+        i2s_write(I2S_SPK_NUM, payload, len, &written, 100);
       }
     }
     
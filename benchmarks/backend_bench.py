@@ -0,0 +1,99 @@
+# Parity and speed check: PyTorch YOLO vs an exported backend on the same fixed images.
+# Run from the repo root: python -m benchmarks.backend_bench [onnx|openvino] [--int8] [--model path.pt]
+# Exits non-zero if the exported model's detections drift from PyTorch beyond the tolerance.
+import sys
+import glob
+import time
+import numpy as np
+import multiprocessing as mp
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+from config import Config
+from core.backends import load_yolo, calibration_images, IMAGE_EXTS
+
+MIN_RECALL = 0.9  # fraction of detections each side must find in the other
+MIN_IOU = 0.5
+RUNS = 20
+
+
+def fixed_images():
+    # The images shipped with ultralytics are always available; calibration frames add our own scenes
+    from ultralytics.utils import ASSETS
+    files = sorted(f for f in glob.glob(str(ASSETS / "*")) if f.lower().endswith(IMAGE_EXTS))
+    return files + calibration_images(8)
+
+
+def run(path, backend, int8, files, out):
+    # Child process: one model per process so peak RSS belongs to that backend alone
+    import cv2
+    model = load_yolo(path, backend=backend, int8=int8)
+    images = [cv2.imread(f) for f in files]
+    dets = []
+    for img in images:
+        r = model.predict(img, conf=Config.STD_CONF, imgsz=Config.YOLO_IMGSZ, verbose=False)[0]
+        dets.append((r.boxes.cls.cpu().numpy().astype(int).tolist(), r.boxes.xyxy.cpu().numpy().tolist()))
+    t0 = time.perf_counter()
+    for i in range(RUNS):
+        model.predict(images[i % len(images)], conf=Config.STD_CONF, imgsz=Config.YOLO_IMGSZ, verbose=False)
+    fps = RUNS / (time.perf_counter() - t0)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else 0.0
+    out.put((dets, fps, rss))
+
+
+def measure(path, backend, int8, files):
+    ctx = mp.get_context("spawn")
+    q = ctx.Queue()
+    p = ctx.Process(target=run, args=(path, backend, int8, files, q))
+    p.start()
+    res = q.get()
+    p.join()
+    return res
+
+
+def iou(a, b):
+    a, b = np.asarray(a, dtype=np.float32).reshape(-1, 4), np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area = lambda x: np.prod(x[:, 2:] - x[:, :2], axis=1)
+    return inter / (area(a)[:, None] + area(b)[None, :] - inter + 1e-9)
+
+
+def recall(ref, other):
+    # Share of `ref` detections with a same-class box in `other` above MIN_IOU, and their mean IoU
+    found, ious = 0, []
+    for (rc, rb), (oc, ob) in zip(ref, other):
+        if not rc: continue
+        m = iou(rb, ob) if oc else np.zeros((len(rc), 0))
+        if m.size: m[np.asarray(rc)[:, None] != np.asarray(oc)[None, :]] = 0
+        best = m.max(axis=1) if m.size else np.zeros(len(rc))
+        found += int((best >= MIN_IOU).sum())
+        ious.extend(best[best >= MIN_IOU].tolist())
+    total = sum(len(rc) for rc, _ in ref)
+    return (found / total if total else 1.0), (float(np.mean(ious)) if ious else 0.0)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    backend = next((a for a in args if a in ("onnx", "openvino")), "onnx")
+    int8 = "--int8" in args
+    path = args[args.index("--model") + 1] if "--model" in args else Config.YOLO_STD_PATH
+    files = fixed_images()
+
+    ref, ref_fps, ref_rss = measure(path, "torch", False, files)
+    got, fps, rss = measure(path, backend, int8, files)
+    r_fwd, mean_iou = recall(ref, got)
+    r_back, _ = recall(got, ref)
+
+    name = f"{backend}{' INT8' if int8 else ''}"
+    print(f"{len(files)} images | torch {ref_fps:5.1f} fps, {ref_rss:6.0f} MB | "
+          f"{name} {fps:5.1f} fps, {rss:6.0f} MB | x{fps / ref_fps:4.1f}")
+    print(f"parity: {r_fwd:.1%} of torch boxes found, {r_back:.1%} of {name} boxes confirmed, mean IoU {mean_iou:.3f}")
+    if min(r_fwd, r_back) < MIN_RECALL:
+        print("❌ Parity check failed")
+        sys.exit(1)
+    print("✅ Parity check passed")
@@ -0,0 +1,41 @@
+# Pacing check: a clean stream through PacedSender must report no underruns and no late packets, and
+# each utterance must finish about SPK_LEAD_SEC ahead of real time (the lead is sent as a burst).
+# Run from the repo root: python -m benchmarks.speaker_bench
+# Exits non-zero if the pacing check fails.
+import sys
+import time
+import socket
+
+from config import Config
+from core.speaker import PacedSender
+
+UTTERANCES = 5
+PACKETS = 10
+TOLERANCE = 0.02  # seconds of scheduling slack per utterance
+
+
+if __name__ == "__main__":
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))  # packets land here and are never read
+    spk = PacedSender([sink.getsockname()])
+    chunk = bytes(Config.SPK_CHUNK_SIZE)
+    packet = len(chunk) / 2 / Config.SPK_SAMPLE_RATE
+    audio = PACKETS * packet
+    expected = max(0.0, audio - packet - Config.SPK_LEAD_SEC)  # the last packet leaves `lead` before it plays
+    ok = True
+    for i in range(UTTERANCES):
+        spk.begin()
+        t0 = time.monotonic()
+        for _ in range(PACKETS):
+            spk.send(chunk)
+        spk.end()
+        took = time.monotonic() - t0
+        ok &= abs(took - expected) <= TOLERANCE
+        print(f"utterance {i}: {took * 1e3:6.1f} ms (audio {audio * 1e3:.0f} ms, expected ~{expected * 1e3:.0f} ms)")
+        time.sleep(audio)  # let the "device" play out before the next utterance
+    st = spk.status()
+    print(f"packets {st['packets']} | late {st['late']} | underruns {st['underruns']} | "
+          f"max late {st['max_late_ms']} ms")
+    ok &= st["late"] == 0 and st["underruns"] == 0
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
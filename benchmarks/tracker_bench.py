@@ -0,0 +1,110 @@
+# Micro-benchmark: vectorized ObjectTracker vs the original loop-based implementation.
+# Run from the repo root: python -m benchmarks.tracker_bench
+# Tiny scenes (~5 objects) are slower than the legacy loop because of fixed NumPy call overhead
+# (~0.06 vs ~0.03 ms/frame); the vectorized tracker pulls ahead from ~20 objects.
+import time
+import numpy as np
+from collections import defaultdict
+
+from config import Config
+from core.tracker import ObjectTracker
+
+
+class LegacyTracker:
+    # The pre-vectorization tracker, kept verbatim for comparison
+    def __init__(self):
+        self.tracked_objects = {}
+        self.face_regions = []
+
+    def set_face_regions(self, face_boxes):
+        self.face_regions = face_boxes
+
+    def get_centroid(self, box):
+        return int((box[0] + box[2]) / 2), int((box[1] + box[3]) / 2)
+
+    def is_in_face_region(self, box):
+        if not Config.FACE_PRIORITY or not self.face_regions: return False
+        x1, y1, x2, y2 = box
+        for fx1, fy1, fx2, fy2 in self.face_regions:
+            if not (x2 < (fx1 - Config.FACE_REGION_EXPAND) or x1 > (fx2 + Config.FACE_REGION_EXPAND) or y2 < (
+                    fy1 - Config.FACE_REGION_EXPAND) or y1 > (fy2 + Config.FACE_REGION_EXPAND)): return True
+        return False
+
+    def update(self, detections_by_class):
+        current_detections = defaultdict(list)
+        for cls, boxes in detections_by_class.items():
+            if Config.DOG_CLASS_FILTER and cls in Config.ANIMAL_CLASSES:
+                boxes = [b for b in boxes if not self.is_in_face_region(b)]
+            for box in boxes:
+                current_detections[cls].append(self.get_centroid(box))
+
+        new_tracked_objects = defaultdict(list)
+        for cls, old_objects in self.tracked_objects.items():
+            for old_obj in old_objects:
+                matched = False
+                if cls in current_detections:
+                    for i, new_cent in enumerate(current_detections[cls]):
+                        distance = np.linalg.norm(np.array(old_obj["centroid"]) - np.array(new_cent))
+                        if distance < Config.SPATIAL_CLUSTERING_DISTANCE:
+                            old_obj["centroid"] = new_cent
+                            old_obj["count"] += 1
+                            old_obj["age"] = 0
+                            new_tracked_objects[cls].append(old_obj)
+                            current_detections[cls].pop(i)
+                            matched = True
+                            break
+                if not matched:
+                    old_obj["age"] += 1
+                    if old_obj["age"] < Config.MAX_TRACK_AGE:
+                        new_tracked_objects[cls].append(old_obj)
+        for cls, new_cents in current_detections.items():
+            for cent in new_cents:
+                new_tracked_objects[cls].append({"centroid": cent, "count": 1, "age": 0})
+        self.tracked_objects = dict(new_tracked_objects)
+
+    def get_stable(self):
+        return {k: [o["centroid"] for o in v if o["count"] >= Config.MIN_FRAMES_STABLE] for k, v in
+                self.tracked_objects.items()}
+
+
+def make_scene(n_objects, n_frames, classes=("chair", "cup", "bottle", "dog"), seed=0):
+    # Objects spread out on a 1280x720 frame, jittering a few pixels per frame
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 0], [1280, 720], size=(n_objects, 2))
+    cls = [classes[i % len(classes)] for i in range(n_objects)]
+    frames = []
+    for _ in range(n_frames):
+        pos += rng.normal(0, 3, size=pos.shape)
+        dets = defaultdict(list)
+        for (x, y), c in zip(pos, cls):
+            if rng.random() < 0.9:  # occasional missed detection
+                dets[c].append([x - 20, y - 20, x + 20, y + 20])
+        frames.append(dict(dets))
+    return frames
+
+
+def bench(tracker_cls, frames, faces):
+    t = tracker_cls()
+    t0 = time.perf_counter()
+    for dets in frames:
+        t.set_face_regions(faces)
+        t.update(dets)
+    return (time.perf_counter() - t0) / len(frames), t.get_stable()
+
+
+if __name__ == "__main__":
+    faces = [[600, 300, 680, 380]]
+    default = Config.TRACKER_ASSIGNMENT
+    print(f"default assignment: {default}")
+    for n in (5, 20, 50, 100):
+        frames = make_scene(n, 300)
+        legacy, legacy_stable = bench(LegacyTracker, frames, faces)
+        n_legacy = sum(len(v) for v in legacy_stable.values())
+        for mode in ("greedy", "hungarian"):
+            Config.TRACKER_ASSIGNMENT = mode
+            vec, vec_stable = bench(ObjectTracker, frames, faces)
+            # Counts can differ slightly: the legacy tracker takes the first match in range, not the nearest
+            n_vec = sum(len(v) for v in vec_stable.values())
+            print(f"{n:4d} objects | legacy {legacy * 1e3:7.3f} ms/frame | {mode:9s} {vec * 1e3:7.3f} ms/frame | "
+                  f"x{legacy / vec:5.1f} | stable tracks {n_legacy} vs {n_vec}")
+        Config.TRACKER_ASSIGNMENT = default
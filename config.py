@@ -16,6 +16,18 @@ class Config:
     CAM_SOURCE = f"http://{ESP32_CAM_IP}:81/stream"
     LIGHT_ON_URL = f"http://{ESP32_CAM_IP}/light/on"
     LIGHT_OFF_URL = f"http://{ESP32_CAM_IP}/light/off"
+    HW_TIMEOUT = 2
+    HW_RETRIES = 3
+    HW_BACKOFF = 0.5
+
+    # ================== CAMERA STREAM ==================
+    CAM_BUFFER_SIZE = 4
+    CAM_STALE_SEC = 2.0
+    CAM_CONNECT_TIMEOUT = 5.0
+    CAM_RECONNECT_MIN = 0.5
+    CAM_RECONNECT_MAX = 15.0
+    CAM_MAX_READ_FAILS = 20
+    CAM_IDLE_SEC = 30.0  # close the stream when nothing has read a frame for this long; reopened on demand
 
     # ================== THRESHOLDS ==================
     MASTER_VOLUME_DB = -4.0
@@ -27,41 +39,138 @@ class Config:
     # Vision logic
     AUTO_LIGHT_ENABLED = True
     LIGHT_THRESHOLD = 60
+    LIGHT_HYSTERESIS = 8
     LIGHT_SWITCH_COOLDOWN = 2.0
-    SCAN_DURATION = 30
+    SCAN_DURATION = 30  # hard maximum
+    SCAN_MIN_DURATION = 5
+    SCAN_CONVERGENCE = True  # end early once objects and identities stop changing
+    SCAN_STABLE_FRAMES = 15
+    SCAN_NO_FACE_CHECKS = 3  # a person whose face never shows counts as settled after this many empty checks
+    QUICK_SCAN_MIN_DURATION = 2  # voice-triggered scans
+    QUICK_SCAN_DURATION = 8
+    QUICK_SCAN_STABLE_FRAMES = 6
+    SCAN_MAX_CONCURRENT = 1  # one camera: extra requests join the running scan
+    SCAN_JOB_HISTORY = 20
+
+    # Display / streaming (no local window on servers without a display)
+    HEADLESS = os.name != "nt" and not os.environ.get("DISPLAY")
+    STREAM_MAX_FPS = 10
+    STREAM_JPEG_QUALITY = 70
 
     # Image Processing
     BRIGHTNESS_BOOST = True
     BRIGHTNESS_ALPHA = 1.3
     BRIGHTNESS_BETA = 12
+    BRIGHTNESS_STRIDE = 8
+    BRIGHTNESS_EMA_ALPHA = 0.3
+    BRIGHTNESS_BOOST_BELOW = 110  # full frames are only boosted below this raw level; face crops always are
 
     # ================== AI MODELS ==================
     # Paths (calculated relative to this config file)
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     KNOWN_FACES_DIR = os.path.join(BASE_DIR, "known_faces")
-    FACE_ENCODINGS_FILE = os.path.join(BASE_DIR, "face_encodings.pkl")
+    FACE_STORE_FILE = os.path.join(BASE_DIR, "face_encodings.bin")
+    FACE_ENCODINGS_FILE = os.path.join(BASE_DIR, "face_encodings.pkl")  # legacy, migrated on load
 
     VOSK_MODEL_PATH = "model"
+    VOSK_WORKERS = 2
     YOLO_STD_PATH = "yolov8m.pt"
     YOLO_CUSTOM_PATH = "bestv1.pt"
 
+    # Model loading (parallel, in the background; the API is up before the models are)
+    MODEL_LOAD_WORKERS = 4
+    MODEL_WAIT_SEC = 60  # how long a scan waits for a model that is still loading
+    MODEL_WARMUP = True
+
+    # YOLO runtime: "torch", or "onnx"/"openvino" (exported once and cached, PyTorch as fallback)
+    YOLO_BACKEND = "torch"
+    YOLO_INT8 = False
+    YOLO_IMGSZ = 640
+    YOLO_EXPORT_DIR = os.path.join(BASE_DIR, "exports")
+    YOLO_CALIB_DIR = os.path.join(BASE_DIR, "calib")  # a few dozen typical camera frames for INT8
+    YOLO_CALIB_IMAGES = 64
+
     # Model parameters
     STD_CONF = 0.50
     CUSTOM_CONF = 0.40
     FACE_CONF = 0.6
+    FACE_ENCODING_DIM = 128
     FACE_PRIORITY = True
     FACE_REGION_EXPAND = 30
+    FACE_SEARCH_FRACTION = 0.5  # only the upper part of a person box is searched for a face
+    FACE_DETECT_WIDTH = 160  # person crops wider than this are downscaled before HOG
     DOG_CLASS_FILTER = True
 
+    # Scan scheduling
+    FRAME_BUDGET_SEC = 0.5
+    MOTION_STRIDE = 8
+    MOTION_PIXEL_DELTA = 20
+    MOTION_SKIP_THRESHOLD = 0.01
+    MAX_STATIC_SKIP_SEC = 2.0
+    FACE_RECHECK_SEC = 1.0
+    LATENCY_EMA_ALPHA = 0.2
+
+    # Sentry motion gate
+    MOTION_CHECK_FPS = 4
+    MOTION_BG_ALPHA = 0.05
+    MOTION_TRIGGER_THRESHOLD = 0.02
+    MOTION_LIGHT_DELTA = 25
+    MOTION_EVENT_HISTORY = 20
+    SENTRY_MAX_IDLE_SEC = 300
+
+    # Identity cache (per YOLO track id)
+    IDENTITY_MIN_VOTES = 2.5
+    IDENTITY_CONFIDENCE = 0.7
+    IDENTITY_UNKNOWN_WEIGHT = 0.5
+    IDENTITY_TTL = 15.0
+    IDENTITY_AREA_CHANGE = 2.0
+    IDENTITY_FORGET_SEC = 120.0
+
+    # Inference engine
+    INFERENCE_QUEUE_SIZE = 8
+    INFERENCE_MAX_BATCH = 4
+    INFERENCE_PIPELINE_DEPTH = 2
+
     # Tracker
     MIN_FRAMES_STABLE = 2
     SPATIAL_CLUSTERING_DISTANCE = 80
     MAX_TRACK_AGE = 30
+    # "hungarian" (optimal, needs scipy, else greedy) or "greedy". Both cost about the same; with ~5 objects
+    # either is ~0.06 ms/frame, twice the old loop's 0.03 ms but far under 1 ms
+    TRACKER_ASSIGNMENT = "hungarian"
 
     # ================== AUDIO ==================
     EDGE_VOICE = "en-US-JennyNeural"
     SPK_SAMPLE_RATE = 16000
     SPK_CHUNK_SIZE = 1024
+    SPK_LEAD_SEC = 0.12  # audio kept queued ahead on the speaker
+    SPK_ENDPOINTS = [(ESP32_WROOM_IP, SPK_UDP_PORT)]
+    SPK_HEADER = False  # sequence header on speaker packets; enable only once the WROOM runs the current Wroom.ino
+    TTS_LOWPASS_HZ = 3500
+    TTS_HIGHPASS_HZ = 150
+    TTS_PEAK_FLOOR = 0.05
+    TTS_PEAK_RELEASE = 0.999
+    TTS_STOP_POLL = 0.05  # how often a stalled synthesis checks for preemption
+    TTS_CACHE_DIR = os.path.join(BASE_DIR, "tts_cache")
+    TTS_CACHE_MEM_BYTES = 16 * 1024 * 1024
+    TTS_CACHE_DISK_BYTES = 128 * 1024 * 1024
+    TTS_CACHE_MAX_ITEM = 2 * 1024 * 1024  # ~65 s at 16 kHz; longer utterances are not cached
+
+    # ================== VOICE ACTIVITY ==================
+    # Energy gate in front of Vosk
+    VAD_FRAME_MS = 20
+    VAD_MIN_RMS = 300
+    VAD_RATIO = 3.0
+    VAD_NOISE_ALPHA = 0.05
+    VAD_SPEECH_NOISE_ALPHA = 0.002  # slow floor tracking inside speech, so steady noise cannot latch the gate
+    VAD_PREROLL_FRAMES = 10
+    VAD_HANGOVER_FRAMES = 25
+    VAD_MAX_UTTERANCE_FRAMES = 400  # 8 s at 20 ms; longer "speech" is ended and the recognizer reset
+
+    # ================== DIAGNOSTICS ==================
+    PROFILER_ENABLED = False  # sampling profiler at startup; can also be toggled via /profile/on|off
+    PROFILE_INTERVAL = 0.01
+    PROFILE_MAX_DEPTH = 40
 
     # ================== LISTS ==================
     PERSON_ALIASES = {"person", "man", "woman", "boy", "girl"}
@@ -69,9 +178,14 @@ class Config:
     INDOOR_NAMES = {*PERSON_ALIASES, "chair", "sofa", "couch", "bed", "dining table", "tv", "laptop", "microwave",
                     "sink", "bottle", "cup", "backpack"}
     HAZARD_LIST = {"knife", "scissors", "fire", "smoke", "pistol", "gun", "weapon"}
+    TTS_PREWARM_PHRASES = ["Emergency! Heavy smoke!", "Caution. Light smoke.", "Camera offline.", "Light on.",
+                           "Light off.", *[f"ALERT! I see {h}." for h in sorted(HAZARD_LIST)]]
 
     # Commands
     SCAN_TRIGGERS = ["scan room", "room scan", "scandal", "start scan", "check room", "look around", "room scan karo",
                      "Hey Aether"]
     LIGHT_ON_TRIGGERS = ["light on", "turn on light", "lights on"]
-    LIGHT_OFF_TRIGGERS = ["light off", "turn off light", "lights off"]
\ No newline at end of file
+    LIGHT_OFF_TRIGGERS = ["light off", "turn off light", "lights off"]
+    VOICE_COMMAND_MODE = True  # restrict Vosk to a grammar built from the triggers above
+    INTENT_MIN_SCORE = 65
+    INTENT_PARTIAL_SCORE = 100  # act on a partial result only once a whole trigger phrase is heard
\ No newline at end of file
@@ -1,9 +1,12 @@
 import pickle
 import os
-import face_recognition
-from ultralytics import YOLO
-from vosk import Model
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+import core.facestore as facestore
+from core.backends import load_yolo
 
 # Global Model Holders
 yolo_std = None
@@ -13,42 +16,226 @@ KNOWN_FACES = {"encodings": [], "names": []}
 STD_CLASSES_ID = []
 
 
-def load_models():
-    global yolo_std, yolo_custom, vosk_model, KNOWN_FACES, STD_CLASSES_ID
-    print("⏳ Loading AI Models...")
+class FaceIndex:
+    # Photo rows are used as given (possibly a read-only memmap); a permutation groups them per
+    # person so one reduceat gives the closest photo, and a small centroid matrix is kept alongside
+    def __init__(self, encodings, names):
+        self.people = sorted(set(names))
+        pid = {n: i for i, n in enumerate(self.people)}
+        self.photos = np.asarray(encodings, dtype=np.float32).reshape(-1, Config.FACE_ENCODING_DIM)
+        labels = np.array([pid[n] for n in names], dtype=np.intp)
+
+        self.order = np.argsort(labels, kind="stable")
+        self.starts = np.searchsorted(labels[self.order], np.arange(len(self.people)))
+        self.centroids = np.zeros((len(self.people), Config.FACE_ENCODING_DIM), dtype=np.float32)
+        if len(self.photos):
+            np.add.at(self.centroids, labels, self.photos)
+            self.centroids /= np.bincount(labels, minlength=len(self.people))[:, None]
+
+        self.photo_norms = np.einsum("ij,ij->i", self.photos, self.photos)
+        self.centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+
+    def __len__(self):
+        return len(self.photos)
+
+    def person_distances(self, queries):
+        # (Q, P): distance from each query to the closest photo or centroid of each person
+        q = np.asarray(queries, dtype=np.float32).reshape(-1, Config.FACE_ENCODING_DIM)
+        qn = np.einsum("ij,ij->i", q, q)[:, None]
+        d2_photos = qn + self.photo_norms[None, :] - 2.0 * (q @ self.photos.T)
+        d2 = np.minimum.reduceat(d2_photos[:, self.order], self.starts, axis=1)
+        d2 = np.minimum(d2, qn + self.centroid_norms[None, :] - 2.0 * (q @ self.centroids.T))
+        return np.sqrt(np.maximum(d2, 0.0))
+
+    def top_k(self, query, k=3):
+        if not self.people: return []
+        d = self.person_distances(query)[0]
+        k = min(k, len(d))
+        idx = np.argpartition(d, k - 1)[:k]
+        idx = idx[np.argsort(d[idx])]
+        return [(self.people[i], float(d[i])) for i in idx]
+
+    def match_many(self, queries, tolerance=Config.FACE_CONF):
+        if not len(queries): return []
+        if not self.people: return [("Unknown", float("inf"))] * len(queries)
+        d = self.person_distances(queries)
+        best = d.argmin(axis=1)
+        dist = d[np.arange(len(d)), best]
+        return [(self.people[b], float(v)) if v <= tolerance else ("Unknown", float(v)) for b, v in zip(best, dist)]
+
+    def match(self, query, tolerance=Config.FACE_CONF):
+        return self.match_many([query], tolerance)[0]
+
+
+FACE_INDEX = FaceIndex([], [])
 
-    # 1. Face Recognition
-    try:
-        with open(Config.FACE_ENCODINGS_FILE, "rb") as f:
-            KNOWN_FACES = pickle.load(f)
-        print(f"✅ Loaded {len(KNOWN_FACES['names'])} faces")
-    except:
-        KNOWN_FACES = {"encodings": [], "names": []}
 
-    # 2. YOLO Standard
+def set_faces(encodings, names):
+    # Build the new index first, then swap references so readers never see a half-built one
+    global KNOWN_FACES, FACE_INDEX
+    index = FaceIndex(encodings, names)
+    KNOWN_FACES, FACE_INDEX = {"encodings": encodings, "names": names}, index
+
+
+def load_faces():
     try:
-        yolo_std = YOLO(Config.YOLO_STD_PATH)
-        STD_CLASSES_ID = [k for k, v in yolo_std.names.items() if v in Config.INDOOR_NAMES or v in Config.HAZARD_LIST]
-        print("✅ YOLO Std loaded")
+        if not os.path.exists(Config.FACE_STORE_FILE) and os.path.exists(Config.FACE_ENCODINGS_FILE):
+            # One-time migration of the old pickle store written by this server
+            with open(Config.FACE_ENCODINGS_FILE, "rb") as f:
+                data = pickle.load(f)
+            facestore.replace(data["encodings"], data["names"], [""] * len(data["names"]))
+            print("🔁 Migrated face_encodings.pkl to the binary face store")
+        store = facestore.read()
+        set_faces(store.encodings, store.names)
+        print(f"✅ Loaded {len(store.names)} faces")
     except Exception as e:
-        print(f"❌ YOLO Std failed: {e}")
+        if os.path.exists(Config.FACE_STORE_FILE): print(f"❌ Face store failed: {e}")
+        set_faces([], [])
+    return FACE_INDEX
 
-    # 3. YOLO Custom
-    try:
-        yolo_custom = YOLO(Config.YOLO_CUSTOM_PATH)
-        print("✅ YOLO Custom loaded")
-    except:
-        yolo_custom = None
-        print("⚠️ YOLO Custom not found")
 
-    # 4. Vosk
-    try:
-        from vosk import SetLogLevel
-        SetLogLevel(-1)
-        vosk_model = Model(Config.VOSK_MODEL_PATH)
-        print("✅ Vosk loaded")
-    except:
-        vosk_model = None
-        print("⚠️ Vosk not found")
-
-    print("✨ READY")
\ No newline at end of file
+PENDING = "pending"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class _Entry:
+    def __init__(self, name, load, warmup):
+        self.name = name
+        self.load = load
+        self.warmup = warmup
+        self.state = PENDING
+        self.future = None
+        self.value = None
+        self.error = None
+        self.load_ms = None
+        self.warm_ms = None
+
+
+class ModelRegistry:
+    # Each model loads once, in parallel: in the background at startup or on first use, whichever
+    # comes first. A warm-up inference runs before a model is reported ready.
+    def __init__(self, workers=Config.MODEL_LOAD_WORKERS):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-load")
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.started_at = None
+        self.announced = False
+
+    def register(self, name, load, warmup=None):
+        self.entries[name] = _Entry(name, load, warmup)
+
+    def _start(self, e):
+        with self.lock:
+            if e.future is None:
+                if self.started_at is None: self.started_at = time.time()
+                e.future = self.pool.submit(self._load, e)
+            return e.future
+
+    def _load(self, e):
+        e.state = LOADING
+        t0 = time.perf_counter()
+        try:
+            value = e.load()
+        except Exception as ex:
+            e.state, e.error = FAILED, str(ex)
+            print(f"❌ {e.name} failed: {ex}")
+            self._check_done()
+            raise
+        e.load_ms = round((time.perf_counter() - t0) * 1000)
+
+        if e.warmup is not None and Config.MODEL_WARMUP:
+            e.state = WARMING
+            t0 = time.perf_counter()
+            try:
+                e.warmup(value)
+            except Exception as ex:
+                print(f"⚠️ {e.name} warm-up failed: {ex}")
+            e.warm_ms = round((time.perf_counter() - t0) * 1000)
+        e.value, e.state = value, READY
+        print(f"✅ {e.name} ready ({e.load_ms} ms load, {e.warm_ms or 0} ms warm-up)")
+        self._check_done()
+        return value
+
+    def _check_done(self):
+        with self.lock:
+            if self.announced or not self.ready(): return
+            self.announced = True
+        print(f"✨ READY in {time.time() - self.started_at:.1f}s")
+
+    def start_all(self):
+        for e in self.entries.values():
+            self._start(e)
+
+    def get(self, name, timeout=None):
+        # Starts the load if needed. timeout=0 never blocks: None until the model is ready.
+        e = self.entries[name]
+        if e.state == READY: return e.value
+        if e.state == FAILED: return None
+        fut = self._start(e)
+        if timeout == 0: return None
+        try:
+            return fut.result(timeout)
+        except Exception:
+            return None
+
+    def ready(self, name=None):
+        if name is not None: return self.entries[name].state == READY
+        return all(e.state in (READY, FAILED) for e in self.entries.values())
+
+    def status(self):
+        return {e.name: {"state": e.state, "load_ms": e.load_ms, "warm_ms": e.warm_ms, "error": e.error}
+                for e in self.entries.values()}
+
+
+def _load_yolo_std():
+    global yolo_std, STD_CLASSES_ID
+    model = load_yolo(Config.YOLO_STD_PATH)
+    STD_CLASSES_ID = [k for k, v in model.names.items() if v in Config.INDOOR_NAMES or v in Config.HAZARD_LIST]
+    yolo_std = model
+    return model
+
+
+def _load_yolo_custom():
+    global yolo_custom
+    yolo_custom = load_yolo(Config.YOLO_CUSTOM_PATH)
+    return yolo_custom
+
+
+def _load_vosk():
+    global vosk_model
+    from vosk import Model, SetLogLevel
+    SetLogLevel(-1)
+    vosk_model = Model(Config.VOSK_MODEL_PATH)
+    return vosk_model
+
+
+def _warm_yolo(model):
+    # First call builds the predictor and runs the graph once; a blank frame is enough
+    model.predict(np.zeros((Config.YOLO_IMGSZ, Config.YOLO_IMGSZ, 3), dtype=np.uint8), verbose=False)
+
+
+def _warm_faces(index):
+    import face_recognition  # loads the dlib models here rather than in the first scan
+    enc = face_recognition.face_encodings(np.zeros((64, 64, 3), dtype=np.uint8), [(8, 56, 56, 8)])
+    if len(index) and enc: index.match_many(enc)
+
+
+def _warm_vosk(model):
+    from vosk import KaldiRecognizer
+    KaldiRecognizer(model, 16000).AcceptWaveform(bytes(3200))
+
+
+MODELS = ModelRegistry()
+MODELS.register("faces", load_faces, _warm_faces)
+MODELS.register("yolo_std", _load_yolo_std, _warm_yolo)
+MODELS.register("yolo_custom", _load_yolo_custom, _warm_yolo)
+MODELS.register("vosk", _load_vosk, _warm_vosk)
+
+
+def load_models():
+    # Non-blocking: everything loads in the background; callers use MODELS.get()
+    print("⏳ Loading AI Models...")
+    MODELS.start_all()
@@ -1,133 +1,127 @@
 import os
 import time
-import json
-import socket
 import threading
-import asyncio
 import tempfile
-import edge_tts
 import pyttsx3
-from vosk import KaldiRecognizer
-from fuzzywuzzy import process, fuzz
 from pydub import AudioSegment
-from pydub.scipy_effects import low_pass_filter, high_pass_filter
-from pydub.effects import normalize
 
 from config import Config
-import state
-from core.ai import vosk_model
 from core.hardware import control_light_hw
+from core.intents import MATCHER
+from core.jobs import SCANS
+from core.metrics import METRICS
+from core.speaker import SPEAKER
+from core.speech import SpeechScheduler, SUMMARY, ACK
+from core.tts import stream_tts, process_segment, split_chunks, prewarm, TTS_CACHE
 
 
-def stream_to_esp32(filename):
+def stream_to_esp32(filename, should_stop=lambda: False):
     try:
-        audio = AudioSegment.from_file(filename)
-        audio = normalize(audio)
-        audio = low_pass_filter(audio, 3500)
-        audio = high_pass_filter(audio, 150)
-        audio = normalize(audio)
-        audio = audio + Config.MASTER_VOLUME_DB
-
-        raw = audio.set_frame_rate(Config.SPK_SAMPLE_RATE).set_channels(1).set_sample_width(2).raw_data
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-        bytes_per_second = Config.SPK_SAMPLE_RATE * 2
-        chunk_play_duration_sec = Config.SPK_CHUNK_SIZE / bytes_per_second
-        sleep_t = max(0.005, chunk_play_duration_sec * 0.8)
-
-        for i in range(0, len(raw), Config.SPK_CHUNK_SIZE):
-            if not Config.ESP32_WROOM_IP: break
-            sock.sendto(raw[i:i + Config.SPK_CHUNK_SIZE], (Config.ESP32_WROOM_IP, Config.SPK_UDP_PORT))
-            time.sleep(sleep_t)
-        sock.close()
+        SPEAKER.begin()
+        for chunk in process_segment(AudioSegment.from_file(filename)):
+            if should_stop(): return
+            SPEAKER.send(chunk)
+        SPEAKER.end()
     except Exception as e:
         print(f"❌ Stream Error: {e}")
 
 
-def speak(text):
-    if not text.strip(): return
-    print(f"🤖 Speaking: {text}")
-
-    def _t():
-        with state.speaking_lock:
-            state.is_speaking = True
-
-        tf = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tf.close()
+def _say_offline(text, cancelled):
+    # pyttsx3 can only render to a file, and a render cannot be interrupted
+    wav = os.path.join(tempfile.gettempdir(), f"aether_tts_{threading.get_ident()}.wav")
+    try:
+        eng = pyttsx3.init()
+        eng.save_to_file(text, wav)
+        eng.runAndWait()
+        if not cancelled.is_set(): stream_to_esp32(wav, cancelled.is_set)
+    except:
+        pass
+    finally:
         try:
-            asyncio.run(edge_tts.Communicate(text, Config.EDGE_VOICE, rate="+10%").save(tf.name))
-            stream_to_esp32(tf.name)
+            os.remove(wav)
         except:
-            try:
-                eng = pyttsx3.init()
-                wav = tf.name + ".wav"
-                eng.save_to_file(text, wav)
-                eng.runAndWait()
-                stream_to_esp32(wav)
-                os.remove(wav)
-            except:
-                pass
-        finally:
-            try:
-                os.remove(tf.name)
-            except:
-                pass
-            time.sleep(0.5)
-            with state.speaking_lock:
-                state.is_speaking = False
-
-    threading.Thread(target=_t, daemon=True).start()
-
-
-def handle_voice(txt):
-    # Lazy import to avoid circular dependency
-    from core.vision import scan_logic
-
-    if not txt: return
+            pass
+
+
+def _play_offline(text, should_stop):
+    # Own thread, so a preempting utterance never waits for a render; once cancelled it sends nothing more
+    cancelled = threading.Event()
+    worker = threading.Thread(target=_say_offline, args=(text, cancelled), daemon=True)
+    worker.start()
+    while worker.is_alive():
+        if should_stop():
+            cancelled.set()
+            return False
+        worker.join(Config.TTS_STOP_POLL)
+    return True
+
+
+def _play(text, should_stop):
+    t0 = time.perf_counter()
+    sent = [0]  # packets actually delivered, even if synthesis fails part way
+
+    def send(chunk, source):
+        if not sent[0]:
+            METRICS.observe("aether_tts_first_packet_seconds", time.perf_counter() - t0, source=source)
+        SPEAKER.send(chunk)
+        sent[0] += 1
+
+    SPEAKER.begin()
     try:
-        scan_score = process.extractOne(txt, Config.SCAN_TRIGGERS, scorer=fuzz.token_set_ratio)[1]
-        on_score = process.extractOne(txt, Config.LIGHT_ON_TRIGGERS, scorer=fuzz.token_set_ratio)[1]
-        off_score = process.extractOne(txt, Config.LIGHT_OFF_TRIGGERS, scorer=fuzz.token_set_ratio)[1]
-        scores = {"scan": scan_score, "on": on_score, "off": off_score}
-        best_match = max(scores, key=scores.get)
-
-        if scores[best_match] > 65:
-            print(f"🧠 Intent: {best_match} (Score: {scores[best_match]})")
-            if best_match == "scan":
-                threading.Thread(target=scan_logic, kwargs={'is_auto': False}, daemon=True).start()
-            elif best_match == "on":
-                control_light_hw(True)
-                speak("Light on.")
-            elif best_match == "off":
-                control_light_hw(False)
-                speak("Light off.")
+        pcm = TTS_CACHE.get(text)
+        if pcm is not None:
+            for chunk in split_chunks(pcm):
+                if should_stop(): return False
+                send(chunk, "cache")
+            return True
+        # Packets leave as soon as edge_tts audio is decoded; no temp file on this path
+        chunks = []
+        stream_tts(text, lambda c: (chunks.append(c), send(c, "edge")), should_stop)
+        if should_stop(): return False
+        if sent[0]: TTS_CACHE.put(text, b"".join(chunks))
     except Exception as e:
-        print(f"❌ Error in handle_voice: {e}")
+        print(f"⚠️ Edge TTS failed: {e}")
+    finally:
+        SPEAKER.end()
 
+    if not sent[0] and not should_stop():
+        return _play_offline(text, should_stop)  # offline fallback
+    return True
 
-def udp_mic_loop():
-    if not vosk_model: return
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", Config.MIC_UDP_PORT))
-    rec = KaldiRecognizer(vosk_model, 16000)
-    print(f"👂 Mic Listener on {Config.MIC_UDP_PORT}")
 
-    while True:
-        try:
-            data, _ = sock.recvfrom(4096)
-            is_final = rec.AcceptWaveform(data)
-
-            is_currently_speaking = False
-            with state.speaking_lock:
-                is_currently_speaking = state.is_speaking
-
-            if is_final:
-                if is_currently_speaking:
-                    rec.Result()  # Flush buffer
-                else:
-                    txt = json.loads(rec.Result()).get('text', '').strip()
-                    if txt:
-                        print(f"🗣️ Voice: {txt}")
-                        handle_voice(txt)
-        except:
-            pass
\ No newline at end of file
+SPEECH = SpeechScheduler(_play)
+
+
+def speak(text, priority=SUMMARY):
+    if not text.strip(): return
+    print(f"🤖 Speaking: {text}")
+    SPEECH.say(text, priority)
+
+
+def prewarm_tts():
+    threading.Thread(target=prewarm, args=(TTS_CACHE, Config.TTS_PREWARM_PHRASES), daemon=True).start()
+
+
+def handle_intent(intent):
+    if intent == "scan":
+        SCANS.submit(is_auto=False, source="voice", quick=True)
+    elif intent == "on":
+        control_light_hw(True)
+        speak("Light on.", ACK)
+    elif intent == "off":
+        control_light_hw(False)
+        speak("Light off.", ACK)
+
+
+def handle_voice(txt, min_score=Config.INTENT_MIN_SCORE):
+    # Returns True if the text triggered an intent
+    if not txt: return False
+    try:
+        intent, score = MATCHER.match(txt)
+        if intent and score >= min_score:
+            print(f"🧠 Intent: {intent} (Score: {score})")
+            handle_intent(intent)
+            return True
+    except Exception as e:
+        print(f"❌ Error in handle_voice: {e}")
+    return False
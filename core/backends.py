@@ -0,0 +1,117 @@
+import os
+import glob
+import json
+import shutil
+import hashlib
+import cv2
+import numpy as np
+
+from config import Config
+
+BACKENDS = ("torch", "onnx", "openvino")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def _digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:10]
+
+
+def export_path(path, backend, int8):
+    # Cache key covers the weights themselves and every export option, so stale exports are never reused
+    stem = os.path.splitext(os.path.basename(path))[0]
+    dyn = "-dyn" if Config.INFERENCE_MAX_BATCH > 1 else ""
+    tag = f"{stem}-{_digest(path)}-{backend}{'-int8' if int8 else ''}{dyn}-{Config.YOLO_IMGSZ}"
+    return os.path.join(Config.YOLO_EXPORT_DIR, tag + (".onnx" if backend == "onnx" else "_openvino_model"))
+
+
+def calibration_images(limit=None):
+    files = sorted(f for f in glob.glob(os.path.join(Config.YOLO_CALIB_DIR, "*")) if f.lower().endswith(IMAGE_EXTS))
+    return files[:limit or Config.YOLO_CALIB_IMAGES]
+
+
+def letterbox(img, size=None):
+    # Same preprocessing the exported graph expects: keep aspect ratio, pad with grey, RGB, CHW, 0..1
+    size = size or Config.YOLO_IMGSZ
+    h, w = img.shape[:2]
+    r = min(size / h, size / w)
+    nh, nw = round(h * r), round(w * r)
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    out[top:top + nh, left:left + nw] = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return np.ascontiguousarray(out[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def _calib_yaml(names):
+    # Minimal dataset description so the OpenVINO (NNCF) quantizer can read the calibration folder
+    path = os.path.join(Config.YOLO_EXPORT_DIR, "calib.yaml")
+    with open(path, "w") as f:
+        json.dump({"path": os.path.abspath(Config.YOLO_CALIB_DIR), "train": ".", "val": ".", "names": names}, f)
+    return path
+
+
+def _quantize_onnx(src, dest, images):
+    # Static INT8 (QDQ) with activation ranges taken from the calibration images
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_static, CalibrationDataReader, QuantFormat, QuantType
+
+    name = ort.InferenceSession(src, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.it = iter(images)
+
+        def get_next(self):
+            for f in self.it:
+                img = cv2.imread(f)
+                if img is not None: return {name: letterbox(img)}
+            return None
+
+    quantize_static(src, dest, Reader(), quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+
+def _export(path, backend, int8, dest):
+    from ultralytics import YOLO
+    model = YOLO(path)
+    images = calibration_images() if int8 else []
+    if int8 and not images:
+        raise RuntimeError(f"INT8 needs calibration images in {Config.YOLO_CALIB_DIR}")
+
+    kwargs = {"format": backend, "imgsz": Config.YOLO_IMGSZ, "dynamic": Config.INFERENCE_MAX_BATCH > 1}
+    if backend == "openvino" and int8:
+        kwargs.update(int8=True, data=_calib_yaml(model.names))
+    out = str(model.export(**kwargs))
+
+    os.makedirs(Config.YOLO_EXPORT_DIR, exist_ok=True)
+    if backend == "onnx" and int8:
+        _quantize_onnx(out, dest + ".tmp", images)
+        os.remove(out)
+        os.replace(dest + ".tmp", dest)
+    else:
+        shutil.move(out, dest)
+
+
+def load_yolo(path, backend=None, int8=None):
+    # Returns an ultralytics model either way, so .track()/.names work the same for every backend
+    from ultralytics import YOLO  # heavy (pulls in torch); only paid by the thread that loads a model
+    backend = backend or Config.YOLO_BACKEND
+    int8 = Config.YOLO_INT8 if int8 is None else int8
+    if backend == "torch": return YOLO(path)
+    if backend not in BACKENDS: raise ValueError(f"Unknown YOLO backend: {backend}")
+
+    if not os.path.exists(path): YOLO(path)  # fetches the official weights into the working dir (or raises)
+    try:
+        dest = export_path(path, backend, int8)
+        if not os.path.exists(dest):
+            print(f"⏳ Exporting {path} to {backend}{' INT8' if int8 else ''} (one-off)...")
+            _export(path, backend, int8, dest)
+        model = YOLO(dest, task="detect")
+        print(f"⚡ {os.path.basename(path)} running on {backend}{' INT8' if int8 else ''}")
+        return model
+    except Exception as e:
+        print(f"⚠️ {backend} backend unavailable for {path}, using PyTorch: {e}")
+        return YOLO(path)
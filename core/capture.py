@@ -0,0 +1,123 @@
+import cv2
+import time
+import threading
+from collections import deque
+
+from config import Config
+
+
+class FrameGrabber:
+    def __init__(self, source, buffer_size=Config.CAM_BUFFER_SIZE):
+        self.source = source
+        self.frames = deque(maxlen=buffer_size)  # (frame_id, timestamp, frame), oldest dropped first
+        self.frame_id = 0
+        self.connected = False
+        self.reconnects = 0
+        self.last_read = 0.0  # when a consumer last asked for a frame; the stream closes once this goes stale
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        with self._cond:
+            if self._running: return self
+            self._running = True
+            self.last_read = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def _idle(self):
+        return time.time() - self.last_read > Config.CAM_IDLE_SEC
+
+    def _wait_demand(self):
+        # Nobody is reading: keep the camera board idle until latest()/wait_newer() is called again
+        with self._cond:
+            self.frames.clear()  # never hand out a frame from before the disconnect
+            while self._running and self._idle():
+                self._cond.wait()
+
+    def _run(self):
+        backoff = Config.CAM_RECONNECT_MIN
+        while self._running:
+            if self._idle(): self._wait_demand()
+            cap = cv2.VideoCapture(self.source)
+            if not cap.isOpened():
+                cap.release()
+                self.connected = False
+                print(f"❌ Cam offline, retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, Config.CAM_RECONNECT_MAX)
+                continue
+
+            print("📷 Cam stream connected")
+            self.connected = True
+            backoff = Config.CAM_RECONNECT_MIN
+            misses = 0
+            idle = False
+            try:
+                while self._running:
+                    if self._idle():
+                        idle = True
+                        break
+                    suc, frame = cap.read()
+                    if not suc:
+                        misses += 1
+                        if misses > Config.CAM_MAX_READ_FAILS: break
+                        time.sleep(0.05)
+                        continue
+                    misses = 0
+                    with self._cond:
+                        self.frame_id += 1
+                        self.frames.append((self.frame_id, time.time(), frame))
+                        self._cond.notify_all()
+            finally:
+                cap.release()
+                self.connected = False
+                if idle:
+                    print(f"💤 Cam stream idle for {Config.CAM_IDLE_SEC:.0f}s, disconnected")
+                else:
+                    self.reconnects += 1
+                    print("⚠️ Cam stream lost, reconnecting")
+
+    def _touch(self):
+        # Caller holds _cond; wakes the reader thread if it had disconnected
+        if self._idle(): self._cond.notify_all()
+        self.last_read = time.time()
+
+    def latest(self, max_age=Config.CAM_STALE_SEC):
+        # Non-blocking: newest (frame_id, timestamp, frame) or None if nothing fresh
+        with self._cond:
+            self._touch()
+            if not self.frames: return None
+            item = self.frames[-1]
+        if max_age is not None and time.time() - item[1] > max_age: return None
+        return item
+
+    def wait_newer(self, after_id, timeout=1.0):
+        # Blocks until a frame newer than after_id arrives; returns None on timeout
+        deadline = time.time() + timeout
+        with self._cond:
+            self._touch()
+            while not self.frames or self.frames[-1][0] <= after_id:
+                remaining = deadline - time.time()
+                if remaining <= 0: return None
+                self._cond.wait(remaining)
+            return self.frames[-1]
+
+
+_grabber = None
+_grabber_lock = threading.Lock()
+
+
+def get_grabber():
+    global _grabber
+    with _grabber_lock:
+        if _grabber is None:
+            _grabber = FrameGrabber(Config.CAM_SOURCE).start()
+    return _grabber
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import struct
+import numpy as np
+
+from config import Config
+
+# Data file: fixed header, then `count` float32 rows of `dim` values (memory-mappable).
+# Labels file: JSON lines; a header line, then one {"name", "hash"} line per row in the same
+# order, plus {"skip": hash} lines for photos without a face so they are not re-encoded.
+MAGIC = b"AEFE"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")  # magic, version, dim, count, generation
+HEADER_SIZE = 32
+COUNT_OFFSET = 8
+
+
+class StoreError(Exception):
+    pass
+
+
+class FaceStore:
+    def __init__(self, encodings, names, hashes, skipped, generation):
+        self.encodings = encodings
+        self.names = names
+        self.hashes = hashes
+        self.skipped = skipped
+        self.generation = generation
+
+
+def labels_path(path):
+    return path + ".labels"
+
+
+def _read_header(f, path):
+    magic, version, dim, count, generation = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC: raise StoreError(f"{path}: not a face store")
+    if version != VERSION: raise StoreError(f"{path}: unsupported version {version}")
+    return dim, count, generation
+
+
+def _read_labels(path):
+    with open(labels_path(path), "r", encoding="utf-8") as f:
+        head = json.loads(f.readline())
+        rows, skipped = [], set()
+        for line in f:
+            if not line.strip(): continue
+            entry = json.loads(line)
+            if "skip" in entry:
+                skipped.add(entry["skip"])
+            else:
+                rows.append((entry["name"], entry["hash"]))
+    return head, rows, skipped
+
+
+def read(path=None, retries=3):
+    path = path or Config.FACE_STORE_FILE
+    for _ in range(retries):
+        with open(path, "rb") as f:
+            dim, count, generation = _read_header(f, path)
+        head, rows, skipped = _read_labels(path)
+        if head.get("generation") == generation and len(rows) >= count: break
+        # A replace() landed between the two reads; pick up the new pair
+        time.sleep(0.05)
+    else:
+        raise StoreError(f"{path}: data and label table do not match")
+
+    if dim != Config.FACE_ENCODING_DIM: raise StoreError(f"{path}: dimension {dim} != {Config.FACE_ENCODING_DIM}")
+    if count and os.name == "nt":
+        # Windows cannot replace or truncate a file that is still mapped, so read a private copy there
+        encodings = np.fromfile(path, dtype=np.float32, count=count * dim, offset=HEADER_SIZE).reshape(count, dim)
+    elif count:
+        encodings = np.memmap(path, dtype=np.float32, mode="r", offset=HEADER_SIZE, shape=(count, dim))
+    else:
+        encodings = np.zeros((0, dim), dtype=np.float32)
+    rows = rows[:count]
+    return FaceStore(encodings, [n for n, _ in rows], [h for _, h in rows], skipped, generation)
+
+
+def _label_lines(names, hashes, skipped):
+    lines = [json.dumps({"name": n, "hash": h}) for n, h in zip(names, hashes)]
+    lines += [json.dumps({"skip": h}) for h in sorted(skipped)]
+    return "".join(line + "\n" for line in lines)
+
+
+def _fsync_write(path, data, mode):
+    with open(path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def replace(encodings, names, hashes, skipped=(), path=None):
+    # Full rewrite: both files are written to temp names and swapped in with os.replace
+    path = path or Config.FACE_STORE_FILE
+    rows = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32).reshape(-1, Config.FACE_ENCODING_DIM))
+    generation = time.time_ns()
+
+    header = HEADER.pack(MAGIC, VERSION, Config.FACE_ENCODING_DIM, len(rows), generation).ljust(HEADER_SIZE, b"\0")
+    head = json.dumps({"version": VERSION, "dim": Config.FACE_ENCODING_DIM, "generation": generation}) + "\n"
+
+    _fsync_write(path + ".tmp", header + rows.tobytes(), "wb")
+    _fsync_write(labels_path(path) + ".tmp", head + _label_lines(names, hashes, skipped), "w")
+    os.replace(labels_path(path) + ".tmp", labels_path(path))
+    os.replace(path + ".tmp", path)
+
+
+def append(encodings, names, hashes, skipped=(), path=None):
+    # Append-only update: rows, then labels, then the row count in the header is bumped last,
+    # so a crash part-way leaves the previous count (and readers) consistent
+    path = path or Config.FACE_STORE_FILE
+    if not os.path.exists(path):
+        return replace(encodings, names, hashes, skipped, path)
+
+    old = read(path)
+    if len(_read_labels(path)[1]) != len(old.names):
+        # Leftover labels from an interrupted append; rewrite so the table matches the data again
+        replace(np.asarray(old.encodings), old.names, old.hashes, old.skipped, path)
+    del old
+
+    rows = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32).reshape(-1, Config.FACE_ENCODING_DIM))
+    with open(path, "r+b") as f:
+        dim, count, _ = _read_header(f, path)
+        f.seek(HEADER_SIZE + count * dim * 4)
+        f.truncate()
+        f.write(rows.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+        _fsync_write(labels_path(path), _label_lines(names, hashes, skipped), "a")
+
+        f.seek(COUNT_OFFSET)
+        f.write(struct.pack("<I", count + len(rows)))
+        f.flush()
+        os.fsync(f.fileno())
@@ -1,46 +1,102 @@
-import requests
-import socket
 import time
-import state
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
 from config import Config
+import state
+
+
+class LightClient:
+    # One keep-alive session and one worker; callers only record the state they want. Repeated or
+    # superseded on/off requests collapse into the latest one, so nothing upstream waits on the network.
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.desired = None
+        self.confirmed = None
+        self.pending = False
+        self.busy = False
+        self.last_error = None
+        self.last_change = 0.0
+        self.sent = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True, name="light").start()
+
+    def set(self, on, force=False):
+        # force resends even if the device already confirmed this state (e.g. after an ESP32 reboot)
+        with self.cond:
+            if self.desired == on and (self.pending or self.busy or (self.confirmed == on and not force)):
+                self.coalesced += 1
+                return
+            if self.pending: self.coalesced += 1  # an unsent opposite command is simply replaced
+            self.desired, self.pending = on, True
+            state.esp_l = on
+            self.cond.notify_all()
+
+    def wait_confirmed(self, on, timeout):
+        deadline = time.time() + timeout
+        with self.cond:
+            while self.pending or self.busy:  # includes the backoff between retries
+                remaining = deadline - time.time()
+                if remaining <= 0 or self.desired != on: return False
+                self.cond.wait(remaining)
+            return self.desired == on and self.confirmed == on
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                target = self.desired
+                self.pending, self.busy = False, True
+
+            url = Config.LIGHT_ON_URL if target else Config.LIGHT_OFF_URL
+            delivered = False
+            for attempt in range(Config.HW_RETRIES):
+                print(f"🔌 Sending request to ESP32-CAM: {url}")
+                try:
+                    self.session.get(url, timeout=Config.HW_TIMEOUT)
+                    with self.cond:
+                        self.sent += 1
+                        self.confirmed, self.last_error, self.last_change = target, None, time.time()
+                        self.cond.notify_all()
+                    delivered = True
+                    break
+                except Exception as e:
+                    print(f"❌ Light Error: {e}")
+                    with self.cond:
+                        self.failures += 1
+                        self.last_error = str(e)
+                        # Back off before retrying, unless a newer command replaces this one
+                        if not self.pending and attempt + 1 < Config.HW_RETRIES:
+                            self.cond.wait(Config.HW_BACKOFF * 2 ** attempt)
+                        if self.pending: break
+            with self.cond:
+                if not delivered and not self.pending:
+                    self.confirmed = None  # device state unknown after giving up; the next set() sends again
+                self.busy = False
+                self.cond.notify_all()
+
+    def status(self):
+        with self.cond:
+            return {"desired": self.desired, "confirmed": self.confirmed, "pending": self.pending,
+                    "sent": self.sent, "failures": self.failures, "coalesced": self.coalesced,
+                    "last_error": self.last_error}
+
+
+def delivery_timeout():
+    # Worst case for one command: every attempt times out, with the backoff between attempts
+    backoff = sum(Config.HW_BACKOFF * 2 ** i for i in range(Config.HW_RETRIES - 1))
+    return Config.HW_TIMEOUT * Config.HW_RETRIES + backoff + 1.0
+
+
+LIGHT = LightClient()
 
 
-def control_light_hw(state_bool):
-    url = Config.LIGHT_ON_URL if state_bool else Config.LIGHT_OFF_URL
-    print(f"🔌 Sending request to ESP32-CAM: {url}")
-    try:
-        requests.get(url, timeout=2)
-        return True
-    except Exception as e:
-        print(f"❌ Light Error: {e}")
-        return False
-
-
-def udp_smoke_loop():
-    # Lazy import to prevent circular dependency
-    from core.audio import speak
-
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        sock.bind(("0.0.0.0", Config.SMOKE_UDP_PORT))
-        print(f"👃 Smoke Listener on {Config.SMOKE_UDP_PORT}")
-    except:
-        return
-
-    while True:
-        try:
-            data, _ = sock.recvfrom(1024)
-            val = int(data.decode('utf-8').strip())
-
-            current_time = time.time()
-            if current_time - state.last_smoke_alert_time > Config.SMOKE_ALERT_COOLDOWN:
-                if val > Config.SMOKE_DANGER_THRESHOLD:
-                    print(f"🚨 HEAVY SMOKE: {val}")
-                    speak("Emergency! Heavy smoke!")
-                    state.last_smoke_alert_time = current_time
-                elif val > Config.SMOKE_WARN_THRESHOLD:
-                    print(f"⚠️ Light Smoke: {val}")
-                    speak("Caution. Light smoke.")
-                    state.last_smoke_alert_time = current_time
-        except:
-            time.sleep(1)
\ No newline at end of file
+def control_light_hw(state_bool, force=False):
+    # Non-blocking; the command is queued and delivered in the background
+    LIGHT.set(state_bool, force)
+    return True
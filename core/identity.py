@@ -0,0 +1,95 @@
+import time
+import threading
+
+from config import Config
+
+
+class TrackIdentity:
+    __slots__ = ("votes", "checks", "checked_at", "checked_box", "box", "seen_at")
+
+    def __init__(self, box, now):
+        self.votes = {}
+        self.checks = 0
+        self.checked_at = 0.0
+        self.checked_box = box
+        self.box = box
+        self.seen_at = now
+
+
+def _area(box):
+    return max(1.0, (box[2] - box[0]) * (box[3] - box[1]))
+
+
+def _jumped(a, b):
+    # Same track id but a very different box: likely an id switch after occlusion
+    ratio = _area(a) / _area(b)
+    dx = abs((a[0] + a[2]) - (b[0] + b[2])) / 2
+    dy = abs((a[1] + a[3]) - (b[1] + b[3])) / 2
+    return ratio > Config.IDENTITY_AREA_CHANGE or ratio < 1 / Config.IDENTITY_AREA_CHANGE or \
+        dx > (b[2] - b[0]) or dy > (b[3] - b[1])
+
+
+class IdentityCache:
+    # Keyed by YOLO track id; the std model tracks with persist=True so ids survive across scans
+    def __init__(self):
+        self.tracks = {}
+        self.lock = threading.Lock()
+
+    def observe(self, tid, box, now=None):
+        now = now or time.time()
+        with self.lock:
+            t = self.tracks.get(tid)
+            if t is None:
+                t = self.tracks[tid] = TrackIdentity(box, now)
+            elif _jumped(box, t.box):
+                t.votes = {k: v * 0.5 for k, v in t.votes.items()}
+                t.checked_at = 0.0
+            t.box, t.seen_at = box, now
+
+    def needs_check(self, tid, periodic_due, now=None):
+        now = now or time.time()
+        t = self.tracks.get(tid)
+        if t is None or t.checks == 0 or t.checked_at == 0.0: return True
+        if self.confident(tid):
+            return now - t.checked_at > Config.IDENTITY_TTL or _jumped(t.box, t.checked_box)
+        return periodic_due
+
+    def add(self, tid, name, dist, now=None):
+        now = now or time.time()
+        with self.lock:
+            t = self.tracks.get(tid)
+            if t is None: return
+            t.checks += 1
+            t.checked_at, t.checked_box = now, t.box
+            if dist == float("inf"): return  # no face visible: not evidence either way
+            if name == "Unknown":
+                weight = Config.IDENTITY_UNKNOWN_WEIGHT
+            else:
+                weight = 1.0 + max(0.0, 1.0 - dist / Config.FACE_CONF)  # closer matches count more
+            t.votes[name] = t.votes.get(name, 0.0) + weight
+
+    def best(self, tid):
+        t = self.tracks.get(tid)
+        if t is None or not t.votes: return "Unknown", 0.0, 0.0
+        name = max(t.votes, key=t.votes.get)
+        return name, t.votes[name], t.votes[name] / sum(t.votes.values())
+
+    def checks(self, tid):
+        t = self.tracks.get(tid)
+        return t.checks if t is not None else 0
+
+    def confident(self, tid):
+        name, votes, share = self.best(tid)
+        return name != "Unknown" and votes >= Config.IDENTITY_MIN_VOTES and share >= Config.IDENTITY_CONFIDENCE
+
+    def label(self, tid):
+        return self.best(tid)[0]
+
+    def prune(self, now=None):
+        now = now or time.time()
+        with self.lock:
+            for tid in [k for k, t in self.tracks.items() if now - t.seen_at > Config.IDENTITY_FORGET_SEC]:
+                del self.tracks[tid]
+
+
+IDENTITIES = IdentityCache()
@@ -0,0 +1,123 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+from config import Config
+import core.ai as ai
+
+
+class Detection:
+    __slots__ = ("model", "name", "box", "track_id", "conf")
+
+    def __init__(self, model, name, box, track_id, conf):
+        self.model = model
+        self.name = name
+        self.box = box
+        self.track_id = track_id
+        self.conf = conf
+
+
+class InferenceResult:
+    def __init__(self, frame_id, frame):
+        self.frame_id = frame_id
+        self.frame = frame
+        self.detections = []
+        self.timings = {}
+        self.batch_sizes = {}
+
+    def by_model(self, tag):
+        return [d for d in self.detections if d.model == tag]
+
+
+class _Job:
+    def __init__(self, frame_id, frame, tags):
+        self.result = InferenceResult(frame_id, frame)
+        self.future = Future()
+        self.pending = set(tags)
+        self.lock = threading.Lock()
+
+    def deliver(self, tag, dets, elapsed, batch):
+        with self.lock:
+            self.result.detections.extend(dets)
+            self.result.timings[tag] = elapsed
+            self.result.batch_sizes[tag] = batch
+            self.pending.discard(tag)
+            done = not self.pending
+        if done: self.future.set_result(self.result)
+
+
+class _ModelWorker:
+    def __init__(self, tag, get_model, kwargs):
+        self.tag = tag
+        self.get_model = get_model
+        self.kwargs = kwargs
+        self.jobs = queue.Queue(maxsize=Config.INFERENCE_QUEUE_SIZE)
+        threading.Thread(target=self._run, daemon=True, name=f"infer-{tag}").start()
+
+    def _run(self):
+        while True:
+            batch = [self.jobs.get()]
+            # Fell behind: drain what is waiting and run it as one batch (in frame order, so
+            # the tracker still sees a consistent sequence)
+            while len(batch) < Config.INFERENCE_MAX_BATCH:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            model = self.get_model()
+            t0 = time.perf_counter()
+            try:
+                kwargs = self.kwargs() if callable(self.kwargs) else self.kwargs
+                frames = [j.result.frame for j in batch]
+                results = model.track(frames if len(frames) > 1 else frames[0], persist=True, verbose=False, **kwargs)
+                per_frame = [self._parse(model, r) for r in results]
+            except Exception as e:
+                print(f"❌ {self.tag} inference error: {e}")
+                per_frame = [[] for _ in batch]
+            elapsed = (time.perf_counter() - t0) / len(batch)
+            for job, dets in zip(batch, per_frame):
+                job.deliver(self.tag, dets, elapsed, len(batch))
+
+    def _parse(self, model, res):
+        dets = []
+        for b in res.boxes:
+            tid = int(b.id[0]) if b.id is not None else None
+            dets.append(Detection(self.tag, model.names[int(b.cls[0])], b.xyxy[0].cpu().numpy().tolist(), tid,
+                                  float(b.conf[0])))
+        return dets
+
+
+class InferenceEngine:
+    def __init__(self):
+        self.workers = [
+            _ModelWorker("std", lambda: ai.MODELS.get("yolo_std", Config.MODEL_WAIT_SEC),
+                         lambda: {"classes": ai.STD_CLASSES_ID, "conf": Config.STD_CONF}),
+            _ModelWorker("custom", lambda: ai.MODELS.get("yolo_custom", Config.MODEL_WAIT_SEC),
+                         {"conf": Config.CUSTOM_CONF}),
+        ]
+
+    def submit(self, frame_id, frame):
+        active = [w for w in self.workers if w.get_model() is not None]
+        job = _Job(frame_id, frame, [w.tag for w in active])
+        if not active:
+            job.future.set_result(job.result)
+        for w in active:
+            w.jobs.put(job)
+        return job.future
+
+    def infer(self, frame_id, frame, timeout=None):
+        return self.submit(frame_id, frame).result(timeout)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = InferenceEngine()
+    return _engine
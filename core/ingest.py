@@ -0,0 +1,190 @@
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+import state
+import core.ai as ai
+from core.vad import EnergyVAD, END
+from core.intents import MATCHER
+
+DROP = "drop"  # utterance interrupted by our own speech: reset without a result
+
+_decoders = ThreadPoolExecutor(max_workers=Config.VOSK_WORKERS, thread_name_prefix="vosk")
+
+
+class MicDevice:
+    # Per-device recognizer; packets queue up while a decode is in flight so each device's audio
+    # stays in order even though decodes run on a shared pool
+    def __init__(self, ip, model):
+        from vosk import KaldiRecognizer
+        self.ip = ip
+        if Config.VOICE_COMMAND_MODE:
+            self.rec = KaldiRecognizer(model, 16000, MATCHER.grammar())
+        else:
+            self.rec = KaldiRecognizer(model, 16000)
+        self.vad = EnergyVAD()
+        self.queue = []
+        self.busy = False
+        self.packets = 0
+        self.errors = 0
+        self.utterances = 0
+        self.fired = False
+        self.last_partial = ""
+        self.last_seen = time.time()
+
+    def feed(self, data):
+        # Runs on the event loop: only voiced audio (and utterance ends) reach the decoder
+        with state.speaking_lock:
+            is_currently_speaking = state.is_speaking
+        if is_currently_speaking:
+            # Our own TTS is playing: drop the echo and abandon any half-heard utterance
+            if self.vad.in_speech: self.queue.append(DROP)
+            self.vad.reset()
+            return
+        self.queue.extend(self.vad.process(data))
+
+    def decode(self, items):
+        # Runs on a worker thread
+        audio = bytearray()
+        for item in items:
+            if isinstance(item, bytes):
+                audio += item
+                continue
+            if audio:
+                self._accept(bytes(audio))
+                audio.clear()
+            if item == END:
+                self.utterances += 1
+                if not self.fired: self._emit(self.rec.FinalResult())
+            self.rec.Reset()
+            self.fired = False
+            self.last_partial = ""
+        if audio: self._accept(bytes(audio))
+
+    def _accept(self, data):
+        if self.fired: return  # command already acted on from a partial; skip the rest of the utterance
+        if self.rec.AcceptWaveform(data):
+            self._emit(self.rec.Result())
+            self.last_partial = ""
+            return
+        # Act on partials once a complete trigger is heard, instead of waiting for the utterance to end.
+        # The best path can show "light on" before the "off" audio is told apart, so the partial must hold
+        # across two decodes and no other intent's trigger may start with it.
+        from core.audio import handle_voice
+        partial = json.loads(self.rec.PartialResult()).get('partial', '').strip()
+        stable, self.last_partial = partial == self.last_partial, partial
+        if partial and stable and not MATCHER.ambiguous(partial) and \
+                handle_voice(partial, Config.INTENT_PARTIAL_SCORE):
+            print(f"⚡ Partial [{self.ip}]: {partial}")
+            self.fired = True
+            self.last_partial = ""
+            self.rec.Reset()
+
+    def _emit(self, result):
+        from core.audio import handle_voice
+        txt = json.loads(result).get('text', '').strip()
+        if txt and txt != "[unk]":
+            print(f"🗣️ Voice [{self.ip}]: {txt}")
+            handle_voice(txt)
+
+
+class MicProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.devices = {}
+
+    def datagram_received(self, data, addr):
+        model = ai.MODELS.get("vosk", timeout=0)  # never block the event loop; audio before it loads is dropped
+        if model is None: return
+        dev = self.devices.get(addr[0])
+        if dev is None:
+            dev = self.devices[addr[0]] = MicDevice(addr[0], model)
+            print(f"🎤 New mic device: {addr[0]}")
+        dev.packets += 1
+        dev.last_seen = time.time()
+        dev.feed(data)
+        if dev.queue and not dev.busy: self._dispatch(dev)
+
+    def _dispatch(self, dev):
+        # Hand everything queued so far to the pool in one go
+        items = list(dev.queue)
+        dev.queue.clear()
+        dev.busy = True
+        fut = asyncio.get_running_loop().run_in_executor(_decoders, dev.decode, items)
+        fut.add_done_callback(lambda f: self._done(dev, f))
+
+    def _done(self, dev, fut):
+        dev.busy = False
+        if fut.exception() is not None:
+            dev.errors += 1
+            print(f"❌ Mic decode error [{dev.ip}]: {fut.exception()}")
+        if dev.queue: self._dispatch(dev)
+
+    def status(self):
+        return {ip: {"packets": d.packets, "errors": d.errors, "backlog": len(d.queue),
+                     "utterances": d.utterances, "voiced": round(d.vad.voiced / max(1, d.vad.frames), 3),
+                     "forced_ends": d.vad.forced,
+                     "last_seen": round(time.time() - d.last_seen, 1)} for ip, d in list(self.devices.items())}
+
+
+class SmokeDevice:
+    def __init__(self, ip):
+        self.ip = ip
+        self.value = None
+        self.packets = 0
+        self.last_alert_time = 0
+        self.last_seen = time.time()
+
+
+class SmokeProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.devices = {}
+
+    def datagram_received(self, data, addr):
+        from core.audio import speak
+        from core.speech import EMERGENCY, HAZARD
+
+        dev = self.devices.get(addr[0])
+        if dev is None:
+            dev = self.devices[addr[0]] = SmokeDevice(addr[0])
+            print(f"👃 New smoke sensor: {addr[0]}")
+        dev.packets += 1
+        try:
+            val = int(data.decode('utf-8').strip())
+        except ValueError:
+            print(f"⚠️ Bad smoke packet from {addr[0]}: {data[:32]!r}")
+            return
+        dev.value, dev.last_seen = val, time.time()
+
+        current_time = time.time()
+        if current_time - dev.last_alert_time > Config.SMOKE_ALERT_COOLDOWN:
+            if val > Config.SMOKE_DANGER_THRESHOLD:
+                print(f"🚨 HEAVY SMOKE [{addr[0]}]: {val}")
+                speak("Emergency! Heavy smoke!", EMERGENCY)
+                dev.last_alert_time = state.last_smoke_alert_time = current_time
+            elif val > Config.SMOKE_WARN_THRESHOLD:
+                print(f"⚠️ Light Smoke [{addr[0]}]: {val}")
+                speak("Caution. Light smoke.", HAZARD)
+                dev.last_alert_time = state.last_smoke_alert_time = current_time
+
+    def status(self):
+        return {ip: {"value": d.value, "packets": d.packets, "last_seen": round(time.time() - d.last_seen, 1)}
+                for ip, d in list(self.devices.items())}
+
+
+MIC = MicProtocol()
+SMOKE = SmokeProtocol()
+
+
+async def start():
+    # Both listeners live in the server's event loop; no thread per port or per device
+    loop = asyncio.get_running_loop()
+    await loop.create_datagram_endpoint(lambda: MIC, local_addr=("0.0.0.0", Config.MIC_UDP_PORT))
+    print(f"👂 Mic Listener on {Config.MIC_UDP_PORT}")
+    await loop.create_datagram_endpoint(lambda: SMOKE, local_addr=("0.0.0.0", Config.SMOKE_UDP_PORT))
+    print(f"👃 Smoke Listener on {Config.SMOKE_UDP_PORT}")
+
+
+def status():
+    return {"mic": MIC.status(), "smoke": SMOKE.status()}
@@ -0,0 +1,79 @@
+import re
+import json
+from difflib import SequenceMatcher
+from collections import defaultdict
+
+from config import Config
+
+
+def normalize(text):
+    return " ".join(re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split())
+
+
+def token_set_ratio(a, b):
+    # Same idea as fuzzywuzzy's token_set_ratio on token sets: shared words plus the best-matching remainder
+    sect = " ".join(sorted(a & b))
+    t1 = (sect + " " + " ".join(sorted(a - b))).strip()
+    t2 = (sect + " " + " ".join(sorted(b - a))).strip()
+    pairs = [(t1, t2)] + ([(sect, t1), (sect, t2)] if sect else [])
+    return int(round(100 * max(SequenceMatcher(None, x, y).ratio() for x, y in pairs)))
+
+
+class IntentMatcher:
+    # Built once from the trigger lists: exact phrases hit a dict, anything else only scores the
+    # phrases that share a token with the utterance (via an inverted index). Without the Vosk grammar
+    # speech can come out as any word ("scanning"), so fuzzy mode also scores every phrase by token set.
+    def __init__(self, intents, fuzzy=False):
+        self.fuzzy = fuzzy
+        self.phrases = []
+        self.exact = {}
+        self.index = defaultdict(list)
+        for intent, triggers in intents.items():
+            for trigger in triggers:
+                norm = normalize(trigger)
+                if not norm: continue
+                idx = len(self.phrases)
+                self.phrases.append((intent, norm, frozenset(norm.split())))
+                self.exact.setdefault(norm, intent)
+                for tok in set(norm.split()):
+                    self.index[tok].append(idx)
+
+    def match(self, text):
+        # Returns (intent, score 0-100); score is the share of the trigger's words heard, with
+        # ties going to the trigger that explains more of the utterance
+        norm = normalize(text)
+        if not norm: return None, 0
+        if norm in self.exact: return self.exact[norm], 100
+        tokens = set(norm.split())
+        hits = defaultdict(int)
+        for tok in tokens:
+            for idx in self.index.get(tok, ()):
+                hits[idx] += 1
+        intent, score = None, 0
+
+        def rank(idx):
+            n_words = len(self.phrases[idx][2])
+            return hits[idx] / n_words, hits[idx] / len(tokens)
+
+        if hits:
+            best = max(hits, key=rank)
+            intent, score = self.phrases[best][0], int(round(100 * rank(best)[0]))
+        if self.fuzzy and score < 100:
+            for name, _, words in self.phrases:
+                s = token_set_ratio(tokens, words)
+                if s > score: intent, score = name, s
+        return intent, score
+
+    def ambiguous(self, text):
+        # True if a trigger for a different intent starts with this text, so more speech may change it
+        norm = normalize(text)
+        intent = self.exact.get(norm)
+        return any(p.startswith(norm + " ") and name != intent for name, p, _ in self.phrases)
+
+    def grammar(self):
+        # Vosk grammar: every trigger phrase, plus [unk] so out-of-grammar speech is not forced into one
+        return json.dumps(sorted({norm for _, norm, _ in self.phrases}) + ["[unk]"])
+
+
+MATCHER = IntentMatcher({"scan": Config.SCAN_TRIGGERS, "on": Config.LIGHT_ON_TRIGGERS,
+                         "off": Config.LIGHT_OFF_TRIGGERS}, fuzzy=not Config.VOICE_COMMAND_MODE)
@@ -0,0 +1,149 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from core.metrics import METRICS
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+
+class ScanJob:
+    # One scan request (plus any requests merged into it). scan_logic polls the events and reports progress.
+    def __init__(self, is_auto, source, quick=False):
+        self.id = uuid.uuid4().hex[:8]
+        self.is_auto = is_auto
+        self.quick = quick  # shorter limits, for voice requests that expect a quick answer
+        self.sources = [source]
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = 0.0
+        self.frames = 0
+        self.stop_reason = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()  # abandon: no summary
+        self.stop_event = threading.Event()  # finish early: summary from what was seen so far
+        self.done_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def should_stop(self):
+        return self.cancel_event.is_set() or self.stop_event.is_set()
+
+    def stop(self, reason):
+        if self.stop_reason is None: self.stop_reason = reason
+        self.stop_event.set()
+
+    def report(self, progress, frames):
+        self.progress = min(1.0, progress)
+        self.frames = frames
+
+    def wait(self, timeout=None):
+        return self.done_event.wait(timeout)
+
+    def to_dict(self):
+        now = self.finished or time.time()
+        return {"id": self.id, "status": self.status, "auto": self.is_auto, "quick": self.quick,
+                "sources": list(self.sources), "progress": round(self.progress, 3), "frames": self.frames,
+                "elapsed": round(now - self.started, 1) if self.started else 0.0,
+                "stop_reason": self.stop_reason, "result": self.result, "error": self.error}
+
+
+class ScanJobManager:
+    # Every scan (HTTP, voice, sentry) goes through here. A request arriving while a scan is queued or
+    # running joins that job instead of starting another capture/track loop on the same camera.
+    def __init__(self, workers=Config.SCAN_MAX_CONCURRENT):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.merged = 0
+
+    def submit(self, is_auto=False, source="api", quick=False):
+        # Returns (job, merged)
+        with self.lock:
+            job = self._active()
+            if job is not None:
+                self.merged += 1
+                job.sources.append(source)
+                if not is_auto: job.is_auto = False  # a manual request upgrades an auto scan to a full summary
+                if not quick: job.quick = False
+                return job, True
+
+            job = ScanJob(is_auto, source, quick)
+            self.jobs[job.id] = job
+            while len(self.jobs) > Config.SCAN_JOB_HISTORY:
+                oldest = next(iter(self.jobs.values()))
+                if oldest.status in ACTIVE: break
+                self.jobs.popitem(last=False)
+            self.submitted += 1
+        self.pool.submit(self._run, job)
+        return job, False
+
+    def _active(self):
+        # Newest job that is still going to produce a result
+        for job in reversed(self.jobs.values()):
+            if job.status in ACTIVE and not job.should_stop(): return job
+        return None
+
+    def _run(self, job):
+        from core.vision import scan_logic  # lazy: vision -> audio -> jobs
+
+        with self.lock:
+            if job.cancelled: return
+            job.status, job.started = RUNNING, time.time()
+        status = DONE
+        try:
+            job.result = scan_logic(is_auto=job.is_auto, job=job)
+            if job.cancelled: status = CANCELLED
+        except Exception as e:
+            print(f"❌ Scan job {job.id} failed: {e}")
+            job.error, status = str(e), FAILED
+        self._finish(job, status)
+
+    def _finish(self, job, status):
+        with self.lock:
+            job.status, job.finished = status, time.time()
+            if status == DONE: job.progress = 1.0
+        if job.started:
+            METRICS.observe("aether_scan_seconds", job.finished - job.started, outcome=job.stop_reason or status)
+        job.done_event.set()
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None: return None
+        job.cancel_event.set()
+        with self.lock:
+            queued = job.status == QUEUED
+        if queued: self._finish(job, CANCELLED)  # never started; its worker slot returns immediately
+        return job
+
+    def stop(self, job_id, reason="requested"):
+        job = self.get(job_id)
+        if job is not None: job.stop(reason)
+        return job
+
+    def status(self):
+        with self.lock:
+            active = [j.id for j in self.jobs.values() if j.status in ACTIVE]
+            return {"active": active, "submitted": self.submitted, "merged": self.merged,
+                    "recent": [j.to_dict() for j in list(self.jobs.values())[-5:]]}
+
+
+SCANS = ScanJobManager()
@@ -0,0 +1,42 @@
+import cv2
+import numpy as np
+
+from config import Config
+
+
+def boost(img):
+    return cv2.convertScaleAbs(img, alpha=Config.BRIGHTNESS_ALPHA, beta=Config.BRIGHTNESS_BETA)
+
+
+class BrightnessEstimator:
+    # Mean HSV value (max of B, G, R) on a strided sample, smoothed with an EMA; the dark/bright
+    # decision only flips once the EMA leaves a band around LIGHT_THRESHOLD
+    def __init__(self):
+        self.raw = None  # EMA of the unboosted sample
+        self.level = None  # EMA of what the old full-frame path measured (after boost, if enabled)
+        self.dark = None
+
+    def update(self, frame):
+        s = Config.BRIGHTNESS_STRIDE
+        v = frame[::s, ::s].max(axis=2).astype(np.float32)
+        raw = float(v.mean())
+        level = float(np.clip(v * Config.BRIGHTNESS_ALPHA + Config.BRIGHTNESS_BETA, 0, 255).mean()) \
+            if Config.BRIGHTNESS_BOOST else raw
+
+        a = Config.BRIGHTNESS_EMA_ALPHA
+        self.raw = raw if self.raw is None else (1 - a) * self.raw + a * raw
+        self.level = level if self.level is None else (1 - a) * self.level + a * level
+
+        h = Config.LIGHT_HYSTERESIS
+        if self.dark is None:
+            self.dark = self.level < Config.LIGHT_THRESHOLD
+        elif self.dark and self.level > Config.LIGHT_THRESHOLD + h:
+            self.dark = False
+        elif not self.dark and self.level < Config.LIGHT_THRESHOLD - h:
+            self.dark = True
+        return self.dark
+
+    @property
+    def dim(self):
+        # Dim enough that the detectors benefit from boosting the whole frame
+        return Config.BRIGHTNESS_BOOST and self.raw is not None and self.raw < Config.BRIGHTNESS_BOOST_BELOW
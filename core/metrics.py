@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import bisect
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from config import Config
+
+# Seconds; roughly logarithmic from sub-millisecond stages up to whole scans
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "aether_stage_seconds": "Per-frame time spent in each scan stage",
+    "aether_scan_seconds": "Wall time of a whole scan job",
+    "aether_tts_first_packet_seconds": "Time from starting an utterance to its first speaker packet",
+    "aether_speech_wait_seconds": "Time an utterance waited in the speech queue",
+    "aether_frames_total": "Camera frames seen by scans, by outcome",
+    "aether_udp_packets_total": "UDP packets received or sent, by stream",
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v):
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+
+def _labels(d, **extra):
+    items = {**d, **extra}
+    if not items: return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items.items()) + "}"
+
+
+class Metrics:
+    # Histograms and counters keyed by (name, labels). Observing is a dict lookup, a bisect and three
+    # additions under one uncontended lock; formatting only happens when /metrics is scraped.
+    # Collectors are callables returning [(name, type, labels, value)] read from existing stats.
+    def __init__(self):
+        self.hists = {}
+        self.counters = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            h = self.hists.get(key)
+            if h is None: h = self.hists[key] = Histogram()
+            h.observe(value)
+
+    def inc(self, name, n=1, **labels):
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    @contextmanager
+    def timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def stage(self, stage):
+        return self.timer("aether_stage_seconds", stage=stage)
+
+    def add_collector(self, fn):
+        self.collectors.append(fn)
+
+    def render(self):
+        # Prometheus text exposition format
+        with self.lock:
+            hists = {k: (list(h.counts), h.sum, h.count) for k, h in self.hists.items()}
+            counters = dict(self.counters)
+
+        series = {}  # name -> (type, [lines])
+        for (name, labels), (counts, total, n) in sorted(hists.items()):
+            lines = series.setdefault(name, ("histogram", []))[1]
+            labels, cum = dict(labels), 0
+            for le, c in zip(BUCKETS + ("+Inf",), counts):
+                cum += c
+                lines.append(f"{name}_bucket{_labels(labels, le=le)} {cum}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {n}")
+        for (name, labels), v in sorted(counters.items()):
+            series.setdefault(name, ("counter", []))[1].append(f"{name}{_labels(dict(labels))} {v}")
+        for fn in self.collectors:
+            try:
+                for name, kind, labels, v in fn():
+                    series.setdefault(name, (kind, []))[1].append(f"{name}{_labels(labels)} {float(v)}")
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+
+        out = []
+        for name, (kind, lines) in series.items():
+            if name in HELP: out.append(f"# HELP {name} {HELP[name]}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+def _stack(frame, depth):
+    # Root first; functions identified by where they are defined so samples at different lines merge
+    out = []
+    while frame is not None and len(out) < depth:
+        code = frame.f_code
+        out.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return out[::-1]
+
+
+class SamplingProfiler:
+    # Off by default. While on, a thread snapshots every thread's stack each PROFILE_INTERVAL and
+    # counts collapsed stacks (flamegraph.pl / speedscope input); nothing in the hot path changes.
+    def __init__(self):
+        self.stacks = Counter()
+        self.samples = 0
+        self.running = False
+        self.started_at = None
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.running: return
+            self.running, self.started_at = True, time.time()
+            self.stacks.clear()
+            self.samples = 0
+            self.generation += 1
+        threading.Thread(target=self._run, args=(self.generation,), daemon=True, name="profiler").start()
+
+    def stop(self):
+        self.running = False
+
+    def _run(self, generation):
+        while self.running and generation == self.generation:  # a quick off/on never leaves two samplers
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if names.get(tid) == "profiler": continue
+                key = ";".join([names.get(tid, str(tid))] + _stack(frame, Config.PROFILE_MAX_DEPTH))
+                with self.lock:
+                    self.stacks[key] += 1
+            self.samples += 1
+            time.sleep(Config.PROFILE_INTERVAL)
+
+    def collapsed(self):
+        with self.lock:
+            return "\n".join(f"{k} {v}" for k, v in self.stacks.most_common()) + "\n"
+
+    def status(self):
+        return {"running": self.running, "samples": self.samples, "stacks": len(self.stacks),
+                "seconds": round(time.time() - self.started_at, 1) if self.started_at else 0.0}
+
+
+METRICS = Metrics()
+PROFILER = SamplingProfiler()
@@ -0,0 +1,105 @@
+import cv2
+import time
+import threading
+import numpy as np
+from collections import deque
+from datetime import datetime
+
+from config import Config
+import state
+
+
+def small_gray(frame, stride=Config.MOTION_STRIDE):
+    # Strided sample instead of a full-resolution resize: touches ~1/stride² of the pixels
+    return cv2.cvtColor(np.ascontiguousarray(frame[::stride, ::stride]), cv2.COLOR_BGR2GRAY)
+
+
+def diff_score(a, b):
+    # Fraction of sampled pixels that changed by more than MOTION_PIXEL_DELTA
+    if a is None or b is None or a.shape != b.shape: return 1.0
+    return float(np.count_nonzero(cv2.absdiff(a, b) > Config.MOTION_PIXEL_DELTA)) / a.size
+
+
+class MotionGate:
+    # Cheap always-on monitor: running-average background on a strided grayscale sample
+    def __init__(self, grabber):
+        self.grabber = grabber
+        self.bg = None
+        self.triggered = threading.Event()
+        self.events = deque(maxlen=Config.MOTION_EVENT_HISTORY)
+        self.checks = 0
+        self.triggers = 0
+        self.last_score = 0.0
+        self.last_light_delta = 0.0
+        self._last_id = 0
+        self._rearm = False  # set from the sentry thread; bg is only ever touched by the gate thread
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._running: return self
+            self._running = True
+        threading.Thread(target=self._run, daemon=True, name="motion-gate").start()
+        return self
+
+    def _run(self):
+        while self._running:
+            time.sleep(1.0 / Config.MOTION_CHECK_FPS)
+            if self._rearm or not state.sentry_active:
+                self._rearm = False
+                self.bg = None
+                if not state.sentry_active: continue
+            item = self.grabber.latest()
+            if item is None or item[0] == self._last_id: continue
+            self._last_id = item[0]
+            self.check(small_gray(item[2]))
+
+    def check(self, sig):
+        self.checks += 1
+        cur = sig.astype(np.float32)
+        if self.bg is None or self.bg.shape != cur.shape:
+            self.bg = cur
+            return
+        self.last_score = float(np.count_nonzero(np.abs(cur - self.bg) > Config.MOTION_PIXEL_DELTA)) / cur.size
+        self.last_light_delta = abs(float(cur.mean()) - float(self.bg.mean()))
+        cv2.accumulateWeighted(cur, self.bg, Config.MOTION_BG_ALPHA)
+
+        kind = None
+        if self.last_light_delta > Config.MOTION_LIGHT_DELTA:
+            kind = "light"
+        elif self.last_score > Config.MOTION_TRIGGER_THRESHOLD:
+            kind = "motion"
+        if kind and not self.triggered.is_set() and not self._rearm:
+            self.triggers += 1
+            self.events.append({"time": datetime.now().strftime("%H:%M:%S"), "kind": kind,
+                                "score": round(self.last_score, 4), "light_delta": round(self.last_light_delta, 1)})
+            print(f"🚶 Sentry gate: {kind} ({self.last_score:.3f})")
+            self.triggered.set()
+
+    def wait_trigger(self, timeout):
+        return self.triggered.wait(timeout)
+
+    def rearm(self):
+        # Adopt the current scene as background so the scan's own aftermath does not retrigger. The gate
+        # thread drops bg itself on its next pass; clearing it from here could race with check()
+        self._rearm = True
+        self.triggered.clear()
+
+    def status(self):
+        return {"checks": self.checks, "triggers": self.triggers, "score": round(self.last_score, 4),
+                "light_delta": round(self.last_light_delta, 1), "armed": not self.triggered.is_set(),
+                "events": list(self.events)}
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def get_gate():
+    global _gate
+    with _gate_lock:
+        if _gate is None:
+            from core.capture import get_grabber
+            _gate = MotionGate(get_grabber()).start()
+    return _gate
@@ -0,0 +1,103 @@
+import time
+
+from config import Config
+from core.motion import small_gray, diff_score
+
+
+class ScanScheduler:
+    def __init__(self):
+        self.processed = 0
+        self.dropped = 0
+        self.static = 0
+        self.ref = None
+        self.last_processed_at = 0.0
+        self.last_frame_id = None
+        self.ema_period = None
+        self.last_done_at = None
+        self.last_face_frame = None
+
+    def should_process(self, frame_id, frame_ts, frame):
+        now = time.time()
+        if self.last_frame_id is not None and frame_id > self.last_frame_id + 1:
+            self.dropped += frame_id - self.last_frame_id - 1  # never reached us, the stream moved on
+        self.last_frame_id = frame_id
+
+        if now - frame_ts > Config.FRAME_BUDGET_SEC:
+            self.dropped += 1
+            return False
+
+        sig = small_gray(frame)
+        if self.ref is not None and now - self.last_processed_at < Config.MAX_STATIC_SKIP_SEC and \
+                diff_score(sig, self.ref) < Config.MOTION_SKIP_THRESHOLD:
+            self.static += 1
+            return False
+
+        self.ref = sig
+        self.last_processed_at = now
+        self.processed += 1
+        return True
+
+    def frame_done(self):
+        now = time.time()
+        if self.last_done_at is not None:
+            period, a = now - self.last_done_at, Config.LATENCY_EMA_ALPHA
+            self.ema_period = period if self.ema_period is None else (1 - a) * self.ema_period + a * period
+        self.last_done_at = now
+
+    def face_interval(self):
+        # Re-check faces every FACE_RECHECK_SEC of wall time, converted to frames at measured throughput
+        if not self.ema_period: return 1
+        return max(1, round(Config.FACE_RECHECK_SEC / self.ema_period))
+
+    def face_due(self):
+        if self.last_face_frame is None or self.processed - self.last_face_frame >= self.face_interval():
+            self.last_face_frame = self.processed
+            return True
+        return False
+
+    def stats(self):
+        return {"processed": self.processed, "dropped": self.dropped, "static": self.static,
+                "frame_ms": round((self.ema_period or 0) * 1000, 1)}
+
+
+class ConvergenceDetector:
+    # Ends a scan once its summary would stop changing: the stable objects and identity labels have
+    # held for N frames and every person in view has a settled vote. Frames the scheduler skipped as
+    # static count too, so a still scene converges without waiting on its sparse processed frames.
+    # Min/max bound the scan.
+    def __init__(self):
+        self.signature = None
+        self.settled = False
+        self.unchanged = 0
+
+    def limits(self, quick):
+        if quick:
+            return Config.QUICK_SCAN_MIN_DURATION, Config.QUICK_SCAN_DURATION, Config.QUICK_SCAN_STABLE_FRAMES
+        return Config.SCAN_MIN_DURATION, Config.SCAN_DURATION, Config.SCAN_STABLE_FRAMES
+
+    def update(self, stable, identities, seen_tids, current_tids):
+        sig = (tuple(sorted((k, len(v)) for k, v in stable.items() if v)),
+               tuple(sorted(identities.label(t) for t in seen_tids)))
+        self.settled = all(self._settled(identities, t) for t in current_tids)
+        if sig == self.signature and self.settled:
+            self.unchanged += 1
+        else:
+            self.signature, self.unchanged = sig, 0
+
+    def tick(self):
+        # A frame skipped as unchanged since the last processed one: same signature by construction
+        if self.signature is not None and self.settled:
+            self.unchanged += 1
+
+    def _settled(self, identities, tid):
+        _, votes, share = identities.best(tid)
+        if not votes:  # never showed a face (e.g. facing away): settled once enough checks came up empty
+            return identities.checks(tid) >= Config.SCAN_NO_FACE_CHECKS
+        return votes >= Config.IDENTITY_MIN_VOTES and share >= Config.IDENTITY_CONFIDENCE
+
+    def done(self, elapsed, quick=False):
+        # None while the scan should continue, else the reason it ends
+        lo, hi, need = self.limits(quick)
+        if elapsed >= hi: return "max_duration"
+        if Config.SCAN_CONVERGENCE and elapsed >= lo and self.unchanged >= need: return "converged"
+        return None
@@ -0,0 +1,81 @@
+import time
+import socket
+import struct
+import threading
+
+from config import Config
+
+# 8-byte header in front of every speaker packet: magic, sequence number, stream position in samples.
+# Only sent with Config.SPK_HEADER; older WROOM firmware would play it as audio.
+HEADER = struct.Struct("<2sHI")
+MAGIC = b"AE"
+
+
+class PacedSender:
+    # Packets are released against a monotonic deadline (stream start + samples sent - lead), so pacing
+    # never drifts the way fixed sleeps do. The first `lead` of each stream goes out as a burst to fill
+    # the device buffer; after that every packet leaves `lead` ahead of the moment it is played.
+    def __init__(self, endpoints=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.endpoints = endpoints or Config.SPK_ENDPOINTS
+        self.rate = Config.SPK_SAMPLE_RATE
+        self.lead = Config.SPK_LEAD_SEC
+        self.seq = 0
+        self.t0 = None
+        self.samples = 0
+        self.burst_end = 0
+        self.lock = threading.Lock()
+        self.packets = 0
+        self.late = 0
+        self.underruns = 0
+        self.max_late_ms = 0.0
+
+    def begin(self):
+        with self.lock:
+            self.t0 = None
+            self.samples = 0
+
+    def send(self, chunk):
+        # Serialized (the pacing sleep included): an abandoned offline-TTS worker can still be mid-send
+        # while the next utterance begins
+        with self.lock:
+            self._send(chunk)
+
+    def _send(self, chunk):
+        now = time.monotonic()
+        if self.t0 is None:
+            self.t0 = now
+            self.burst_end = int(self.lead * self.rate)
+        drained = self.t0 + self.samples / self.rate  # when the device plays out everything sent so far
+        if now > drained:
+            # Device buffer ran dry (producer was too slow); restart the clock and refill the lead
+            self.underruns += 1
+            self.t0 = now - self.samples / self.rate
+            self.burst_end = self.samples + int(self.lead * self.rate)
+        elif self.samples >= self.burst_end:
+            deadline = drained - self.lead
+            if now < deadline:
+                time.sleep(deadline - now)
+            else:
+                behind = now - deadline
+                if behind > len(chunk) / 2 / self.rate:
+                    self.late += 1
+                self.max_late_ms = max(self.max_late_ms, behind * 1000)
+
+        packet = HEADER.pack(MAGIC, self.seq, self.samples & 0xFFFFFFFF) + chunk if Config.SPK_HEADER else chunk
+        for ep in self.endpoints:
+            if ep[0]: self.sock.sendto(packet, ep)
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.samples += len(chunk) // 2
+        self.packets += 1
+
+    def end(self):
+        with self.lock:
+            self.t0 = None
+
+    def status(self):
+        return {"packets": self.packets, "late": self.late, "underruns": self.underruns,
+                "max_late_ms": round(self.max_late_ms, 1), "endpoints": len(self.endpoints)}
+
+
+SPEAKER = PacedSender()
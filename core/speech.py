@@ -0,0 +1,127 @@
+import time
+import heapq
+import threading
+
+import state
+from core.metrics import METRICS
+
+# Lower value wins
+EMERGENCY = 0
+HAZARD = 1
+SUMMARY = 2
+ACK = 3
+PRIORITY_NAMES = {EMERGENCY: "emergency", HAZARD: "hazard", SUMMARY: "summary", ACK: "ack"}
+
+
+class SpeechItem:
+    __slots__ = ("text", "priority", "enqueued_at", "done")
+
+    def __init__(self, text, priority):
+        self.text = text
+        self.priority = priority
+        self.enqueued_at = time.time()
+        self.done = False
+
+
+class SpeechScheduler:
+    # Single speaker owner: one utterance at a time, highest priority first, and a more urgent
+    # item stops the current one at the next packet boundary; the interrupted one is queued again
+    def __init__(self, play, tail=0.5):
+        self.play = play  # play(text, should_stop) -> bool (True if it finished)
+        self.tail = tail  # keep is_speaking up a little longer so the mic ignores our own echo
+        self.heap = []
+        self.pending = {}
+        self.current = None
+        self.seq = 0
+        self.cond = threading.Condition()
+        self.preempt = threading.Event()
+        self.spoken = 0
+        self.preempted = 0
+        self.requeued = 0
+        self.merged = 0
+        self.latency = {p: {"count": 0, "avg_ms": 0.0, "max_ms": 0.0} for p in PRIORITY_NAMES}
+        threading.Thread(target=self._run, daemon=True, name="speech").start()
+
+    def say(self, text, priority=SUMMARY):
+        with self.cond:
+            item = self.pending.get(text)
+            if item is not None:
+                # Same message already waiting: keep one copy at the higher priority
+                self.merged += 1
+                if priority < item.priority:
+                    item.priority = priority
+                    self._push(item)
+            elif self.current is not None and self.current.text == text and not self.preempt.is_set():
+                self.merged += 1
+                return
+            else:
+                item = SpeechItem(text, priority)
+                self.pending[text] = item
+                self._push(item)
+            if self.current is not None and item.priority < self.current.priority:
+                self.preempt.set()
+            self.cond.notify()
+
+    def _push(self, item):
+        self.seq += 1
+        heapq.heappush(self.heap, (item.priority, self.seq, item))
+
+    def _pop(self):
+        while self.heap:
+            prio, _, item = heapq.heappop(self.heap)
+            if not item.done and prio == item.priority:  # skip entries superseded by a priority bump
+                return item
+        return None
+
+    def _run(self):
+        while True:
+            with self.cond:
+                item = self._pop()
+                while item is None:
+                    if state.is_speaking and not self.cond.wait(self.tail):
+                        with state.speaking_lock:
+                            state.is_speaking = False
+                    elif not state.is_speaking:
+                        self.cond.wait()
+                    item = self._pop()
+                item.done = True
+                del self.pending[item.text]
+                self.current = item
+                self.preempt.clear()
+
+            with state.speaking_lock:
+                state.is_speaking = True
+            self._record_latency(item)
+            try:
+                finished = self.play(item.text, self.preempt.is_set)
+            except Exception as e:
+                print(f"❌ Speech error: {e}")
+                finished = True
+            with self.cond:
+                self.current = None
+                if finished:
+                    self.spoken += 1
+                else:
+                    self.preempted += 1
+                    print(f"⏭️ Preempted: {item.text}")
+                    if item.text not in self.pending:  # a newer copy already waiting replaces it
+                        again = SpeechItem(item.text, item.priority)
+                        self.pending[item.text] = again
+                        self._push(again)
+                        self.requeued += 1
+
+    def _record_latency(self, item):
+        ms = (time.time() - item.enqueued_at) * 1000
+        METRICS.observe("aether_speech_wait_seconds", ms / 1000, priority=PRIORITY_NAMES[item.priority])
+        s = self.latency[item.priority]
+        s["count"] += 1
+        s["avg_ms"] += (ms - s["avg_ms"]) / s["count"]
+        s["max_ms"] = max(s["max_ms"], ms)
+
+    def status(self):
+        with self.cond:
+            return {"depth": len(self.pending), "current": self.current.text if self.current else None,
+                    "spoken": self.spoken, "preempted": self.preempted,
+                    "requeued": self.requeued, "merged": self.merged,
+                    "latency": {PRIORITY_NAMES[p]: {k: round(v, 1) for k, v in s.items()}
+                                for p, s in self.latency.items()}}
@@ -0,0 +1,82 @@
+import cv2
+import time
+import asyncio
+import threading
+
+from config import Config
+
+
+class StreamClient:
+    # One slot per client: a new frame replaces an unsent one, so slow clients only ever lag by one frame
+    def __init__(self, hub, loop):
+        self.hub = hub
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=1)
+
+    def offer(self, data):
+        self.loop.call_soon_threadsafe(self._put, data)
+
+    def _put(self, data):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.hub.dropped += 1
+        self.queue.put_nowait(data)
+
+
+class FrameHub:
+    def __init__(self):
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.encoded = 0
+        self.dropped = 0
+        self._last_encode = 0.0
+
+    @property
+    def active(self):
+        return bool(self.clients)
+
+    def subscribe(self, loop):
+        client = StreamClient(self, loop)
+        with self.lock:
+            self.clients.add(client)
+        print(f"📺 Stream client joined ({len(self.clients)})")
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+        print(f"📺 Stream client left ({len(self.clients)})")
+
+    def publish(self, frame):
+        # No subscribers, no JPEG encode
+        if not self.clients: return
+        now = time.time()
+        if now - self._last_encode < 1.0 / Config.STREAM_MAX_FPS: return
+        self._last_encode = now
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, Config.STREAM_JPEG_QUALITY])
+        if not ok: return
+        self.encoded += 1
+        data = buf.tobytes()
+        with self.lock:
+            clients = list(self.clients)
+        for c in clients:
+            try:
+                c.offer(data)
+            except RuntimeError:  # client's event loop already closed
+                self.unsubscribe(c)
+
+    async def mjpeg(self):
+        client = self.subscribe(asyncio.get_running_loop())
+        try:
+            while True:
+                data = await client.queue.get()
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(data)).encode() +
+                       b"\r\n\r\n" + data + b"\r\n")
+        finally:
+            self.unsubscribe(client)
+
+    def status(self):
+        return {"clients": len(self.clients), "encoded": self.encoded, "dropped": self.dropped}
+
+
+HUB = FrameHub()
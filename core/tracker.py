@@ -0,0 +1,115 @@
+import numpy as np
+
+from config import Config
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+def assign(dist, max_dist):
+    # Returns (old_idx, new_idx) pairs with distance < max_dist, optimal when scipy is available
+    if dist.size == 0: return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    if linear_sum_assignment is not None and Config.TRACKER_ASSIGNMENT == "hungarian":
+        rows, cols = linear_sum_assignment(np.where(dist < max_dist, dist, 1e6))
+        keep = dist[rows, cols] < max_dist
+        return rows[keep], cols[keep]
+
+    # Greedy by distance: take the globally closest free pair first
+    cand_r, cand_c = np.nonzero(dist < max_dist)
+    order = np.argsort(dist[cand_r, cand_c], kind="stable")
+    used_r, used_c = set(), set()
+    rows, cols = [], []
+    for r, c in zip(cand_r[order].tolist(), cand_c[order].tolist()):
+        if r in used_r or c in used_c: continue
+        used_r.add(r)
+        used_c.add(c)
+        rows.append(r)
+        cols.append(c)
+    return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+
+class ObjectTracker:
+    # Structure of arrays over all tracks; class ids keep matching within a class
+    def __init__(self):
+        self.class_names = []
+        self.class_ids = {}
+        self.cls = np.zeros(0, dtype=np.int32)
+        self.centroids = np.zeros((0, 2), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.int32)
+        self.ages = np.zeros(0, dtype=np.int32)
+        self.face_regions = np.zeros((0, 4), dtype=np.float32)
+
+    def set_face_regions(self, face_boxes):
+        self.face_regions = np.asarray(face_boxes, dtype=np.float32).reshape(-1, 4)
+
+    def get_centroid(self, box):
+        return int((box[0] + box[2]) / 2), int((box[1] + box[3]) / 2)
+
+    def face_region_mask(self, boxes):
+        # True for each box overlapping any (expanded) face region
+        if not Config.FACE_PRIORITY or not len(self.face_regions): return np.zeros(len(boxes), dtype=bool)
+        e = Config.FACE_REGION_EXPAND
+        f = self.face_regions
+        b = boxes[:, None, :]
+        overlap = ~((b[..., 2] < f[:, 0] - e) | (b[..., 0] > f[:, 2] + e) |
+                    (b[..., 3] < f[:, 1] - e) | (b[..., 1] > f[:, 3] + e))
+        return overlap.any(axis=1)
+
+    def is_in_face_region(self, box):
+        return bool(self.face_region_mask(np.asarray([box], dtype=np.float32))[0])
+
+    def _class_id(self, name):
+        cid = self.class_ids.get(name)
+        if cid is None:
+            cid = self.class_ids[name] = len(self.class_names)
+            self.class_names.append(name)
+        return cid
+
+    def update(self, detections_by_class):
+        all_boxes, box_cls, animal = [], [], False
+        for name, boxes in detections_by_class.items():
+            if not boxes: continue
+            all_boxes.extend(boxes)
+            box_cls.extend([self._class_id(name)] * len(boxes))
+            animal = animal or name in Config.ANIMAL_CLASSES
+        boxes = np.asarray(all_boxes, dtype=np.float32).reshape(-1, 4)
+        new_cls = np.asarray(box_cls, dtype=np.int32)
+
+        if Config.DOG_CLASS_FILTER and animal and len(self.face_regions):
+            is_animal = np.array([self.class_names[c] in Config.ANIMAL_CLASSES for c in box_cls], dtype=bool)
+            keep = ~(is_animal & self.face_region_mask(boxes))
+            boxes, new_cls = boxes[keep], new_cls[keep]
+        cents = np.floor((boxes[:, :2] + boxes[:, 2:]) * 0.5)
+
+        self.ages += 1
+        if len(self.cls) and len(new_cls):
+            # One pairwise matrix for every class at once; cross-class pairs are pushed out of range
+            diff = self.centroids[:, None, :] - cents[None, :, :]
+            dist = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+            dist[self.cls[:, None] != new_cls[None, :]] = np.inf
+            rows, cols = assign(dist, Config.SPATIAL_CLUSTERING_DISTANCE)
+            self.centroids[rows] = cents[cols]
+            self.counts[rows] += 1
+            self.ages[rows] = 0
+        else:
+            cols = []
+
+        alive = self.ages < Config.MAX_TRACK_AGE
+        fresh = np.ones(len(cents), dtype=bool)
+        fresh[cols] = False
+        if alive.all() and not fresh.any(): return
+
+        n_fresh = int(fresh.sum())
+        self.cls = np.concatenate([self.cls[alive], new_cls[fresh]])
+        self.centroids = np.concatenate([self.centroids[alive], cents[fresh]])
+        self.counts = np.concatenate([self.counts[alive], np.ones(n_fresh, dtype=np.int32)])
+        self.ages = np.concatenate([self.ages[alive], np.zeros(n_fresh, dtype=np.int32)])
+
+    def get_stable(self):
+        stable = {}
+        for cid in np.unique(self.cls):
+            sel = (self.cls == cid) & (self.counts >= Config.MIN_FRAMES_STABLE)
+            stable[self.class_names[cid]] = [(int(x), int(y)) for x, y in self.centroids[sel]]
+        return stable
@@ -0,0 +1,100 @@
+import os
+import hashlib
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+import core.ai as ai
+import core.facestore as facestore
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+_train_lock = threading.Lock()
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def encode_photo(path):
+    # Runs in a worker process; None means "no face found", which is cached too
+    import face_recognition
+    try:
+        encs = face_recognition.face_encodings(face_recognition.load_image_file(path))
+        return encs[0] if encs else None
+    except Exception as e:
+        print(f"  ❌ Error: {os.path.basename(path)}: {e}")
+        return None
+
+
+def scan_photos():
+    photos = []
+    for person_name in sorted(os.listdir(Config.KNOWN_FACES_DIR)):
+        person_dir = os.path.join(Config.KNOWN_FACES_DIR, person_name)
+        if not os.path.isdir(person_dir): continue
+        for file_name in sorted(os.listdir(person_dir)):
+            if file_name.lower().endswith(IMAGE_EXTS):
+                photos.append((person_name, os.path.join(person_dir, file_name)))
+    return photos
+
+
+def load_store():
+    try:
+        return facestore.read()
+    except Exception:
+        return None
+
+
+def train_faces():
+    with _train_lock:
+        store = load_store()
+        rows = list(zip(store.names, store.hashes)) if store else []
+        skipped = set(store.skipped) if store else set()
+        known = {h for _, h in rows} | skipped
+
+        photos = [(name, file_hash(path), path) for name, path in scan_photos()]
+        todo = sorted({h: path for _, h, path in photos if h not in known}.items())
+        fresh = {}
+        if todo:
+            print(f"🧠 Encoding {len(todo)} new photo(s)...")
+            paths = [path for _, path in todo]
+            if len(todo) == 1:
+                results = [encode_photo(paths[0])]
+            else:
+                workers = min(len(todo), os.cpu_count() or 1)
+                # spawn, not fork: the server is full of threads (grabber, inference, speech, torch/OpenMP
+                # pools) and a forked child can deadlock on a lock one of them held
+                with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+                    results = list(pool.map(encode_photo, paths))
+            fresh = {h: enc for (h, _), enc in zip(todo, results)}
+
+        live = {(name, h) for name, h, _ in photos}
+        encs_by_hash = {h: store.encodings[i] for i, (_, h) in enumerate(rows)} if store else {}
+        encs_by_hash.update({h: e for h, e in fresh.items() if e is not None})
+        new_skips = {h for h, e in fresh.items() if e is None}
+
+        removed = [r for r in rows if r not in live]
+        added, seen = [], set(rows)
+        for name, h, _ in photos:
+            if (name, h) not in seen and h in encs_by_hash:
+                added.append((name, h))
+                seen.add((name, h))
+
+        if removed or store is None:
+            # Deletions need a rewrite; swap the whole store in atomically
+            keep = [r for r in rows if r in live] + added
+            facestore.replace([encs_by_hash[h] for _, h in keep], [n for n, _ in keep], [h for _, h in keep],
+                              (skipped | new_skips) & {h for _, h, _ in photos})
+        elif added or new_skips:
+            facestore.append([encs_by_hash[h] for _, h in added], [n for n, _ in added], [h for _, h in added],
+                             new_skips)
+
+        if removed or added or store is None:
+            ai.load_faces()
+
+        return {"encoded": len(todo), "removed": len(removed), "names": list(ai.FACE_INDEX.people),
+                "total_photos": len(ai.FACE_INDEX)}
@@ -0,0 +1,232 @@
+import os
+import asyncio
+import hashlib
+import threading
+import subprocess
+import numpy as np
+from collections import OrderedDict
+import edge_tts
+from pydub import AudioSegment
+from scipy.signal import butter, sosfilt
+
+from config import Config
+
+
+class StreamingFilter:
+    # Chunk-by-chunk version of the old normalize -> low-pass -> high-pass -> normalize -> volume chain.
+    # Filter state carries across chunks; whole-clip normalize becomes a peak follower (instant attack,
+    # slow release) so gain is known before the end of the utterance.
+    def __init__(self, rate=Config.SPK_SAMPLE_RATE):
+        self.sos = np.vstack([butter(2, Config.TTS_LOWPASS_HZ, "lowpass", fs=rate, output="sos"),
+                              butter(2, Config.TTS_HIGHPASS_HZ, "highpass", fs=rate, output="sos")])
+        self.zi = np.zeros((self.sos.shape[0], 2))
+        self.peak = Config.TTS_PEAK_FLOOR
+        self.release = Config.TTS_PEAK_RELEASE
+        self.volume = 10 ** (Config.MASTER_VOLUME_DB / 20)
+
+    def process(self, pcm):
+        x = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if not len(x): return b""
+        y, self.zi = sosfilt(self.sos, x, zi=self.zi)
+        self.peak = max(float(np.abs(y).max()), self.peak * self.release, Config.TTS_PEAK_FLOOR)
+        out = np.clip(y * (self.volume / self.peak), -1.0, 1.0)
+        return (out * 32767).astype(np.int16).tobytes()
+
+
+class Chunker:
+    # Re-slices arbitrary byte reads into fixed-size, sample-aligned packets
+    def __init__(self, size=Config.SPK_CHUNK_SIZE):
+        self.size = size
+        self.buf = bytearray()
+
+    def feed(self, data):
+        self.buf += data
+        while len(self.buf) >= self.size:
+            yield bytes(self.buf[:self.size])
+            del self.buf[:self.size]
+
+    def flush(self):
+        tail = bytes(self.buf[:len(self.buf) & ~1])
+        self.buf.clear()
+        return tail
+
+
+def _decoder():
+    # ffmpeg (the same binary pydub uses) turns the MP3 byte stream into mono s16le at the speaker rate
+    return subprocess.Popen(
+        [AudioSegment.converter, "-hide_banner", "-loglevel", "error", "-f", "mp3", "-i", "pipe:0",
+         "-f", "s16le", "-ac", "1", "-ar", str(Config.SPK_SAMPLE_RATE), "pipe:1"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+
+def _write(stdin, data):
+    stdin.write(data)
+    stdin.flush()
+
+
+async def _feed_tts(text, stdin):
+    async for msg in edge_tts.Communicate(text, Config.EDGE_VOICE, rate="+10%").stream():
+        if msg["type"] == "audio":
+            await asyncio.to_thread(_write, stdin, msg["data"])
+
+
+async def _run_feed(text, proc, halt):
+    # edge_tts can stall for its whole receive timeout; a watcher cancels the feed and kills the decoder
+    # (which ends the reader) as soon as a more urgent utterance wants the speaker or the reader has died
+    feed = asyncio.ensure_future(_feed_tts(text, proc.stdin))
+    while not feed.done():
+        if halt():
+            feed.cancel()
+            proc.kill()
+            break
+        await asyncio.wait({feed}, timeout=Config.TTS_STOP_POLL)
+    try:
+        await feed
+    except asyncio.CancelledError:
+        pass
+
+
+def stream_tts(text, on_chunk, should_stop=lambda: False):
+    # Synthesize, decode and filter incrementally; on_chunk receives packets as soon as they exist.
+    # Returns the number of packets delivered.
+    proc = _decoder()
+    filt, chunker = StreamingFilter(), Chunker()
+    sent = [0]
+    failed = []
+
+    def pump():
+        try:
+            while True:
+                data = proc.stdout.read(Config.SPK_CHUNK_SIZE)
+                if not data: break
+                for chunk in chunker.feed(filt.process(data)):
+                    if should_stop():
+                        proc.kill()
+                        return
+                    on_chunk(chunk)
+                    sent[0] += 1
+            tail = chunker.flush()
+            if tail:
+                on_chunk(tail)
+                sent[0] += 1
+        except Exception as e:
+            # e.g. sendto failing with no route: stop the decoder so the feed cannot block on a full pipe
+            failed.append(e)
+            proc.kill()
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    try:
+        asyncio.run(_run_feed(text, proc, lambda: should_stop() or not reader.is_alive()))
+    except OSError:
+        if not should_stop() and not failed: raise  # a killed decoder closes the pipe under us
+    finally:
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        reader.join()
+        proc.wait()
+    if failed: raise failed[0]
+    return sent[0]
+
+
+def process_segment(audio):
+    # Offline path (pyttsx3 output): same filter chain over an already decoded AudioSegment
+    raw = audio.set_frame_rate(Config.SPK_SAMPLE_RATE).set_channels(1).set_sample_width(2).raw_data
+    filt, chunker = StreamingFilter(), Chunker()
+    chunks = list(chunker.feed(filt.process(raw)))
+    tail = chunker.flush()
+    return chunks + ([tail] if tail else [])
+
+
+class PhraseCache:
+    # Final processed PCM keyed by (text, voice, volume): LRU in memory, size-bounded on disk
+    def __init__(self, directory=Config.TTS_CACHE_DIR):
+        self.dir = directory
+        self.mem = OrderedDict()
+        self.mem_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.dir, exist_ok=True)
+
+    def key(self, text):
+        raw = f"{text.strip()}|{Config.EDGE_VOICE}|{Config.MASTER_VOLUME_DB}|{Config.SPK_SAMPLE_RATE}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text):
+        k = self.key(text)
+        with self.lock:
+            if k in self.mem:
+                self.mem.move_to_end(k)
+                self.hits += 1
+                return self.mem[k]
+        path = os.path.join(self.dir, k + ".pcm")
+        try:
+            with open(path, "rb") as f:
+                pcm = f.read()
+            os.utime(path)  # mtime doubles as last-used time for disk eviction
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(k, pcm)
+        return pcm
+
+    def put(self, text, pcm):
+        if not pcm or len(pcm) > Config.TTS_CACHE_MAX_ITEM: return
+        k = self.key(text)
+        self._remember(k, pcm)
+        path = os.path.join(self.dir, k + ".pcm")
+        try:
+            with open(path + ".tmp", "wb") as f:
+                f.write(pcm)
+            os.replace(path + ".tmp", path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"⚠️ TTS cache write failed: {e}")
+
+    def _remember(self, k, pcm):
+        with self.lock:
+            if k in self.mem:
+                self.mem_bytes -= len(self.mem.pop(k))
+            self.mem[k] = pcm
+            self.mem_bytes += len(pcm)
+            while self.mem_bytes > Config.TTS_CACHE_MEM_BYTES and len(self.mem) > 1:
+                self.mem_bytes -= len(self.mem.popitem(last=False)[1])
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.dir):
+            if not name.endswith(".pcm"): continue
+            st = os.stat(os.path.join(self.dir, name))
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= Config.TTS_CACHE_DISK_BYTES: break
+            os.remove(os.path.join(self.dir, name))
+            total -= size
+
+
+def split_chunks(pcm, size=Config.SPK_CHUNK_SIZE):
+    return [pcm[i:i + size] for i in range(0, len(pcm), size)]
+
+
+def prewarm(cache, phrases):
+    # Synthesize fixed alerts ahead of time so they play instantly (and offline)
+    warmed = 0
+    for text in phrases:
+        if cache.get(text) is not None: continue
+        chunks = []
+        try:
+            stream_tts(text, chunks.append)
+        except Exception as e:
+            print(f"⚠️ TTS prewarm stopped: {e}")
+            break
+        cache.put(text, b"".join(chunks))
+        warmed += 1
+    print(f"🔥 TTS cache warmed ({warmed} new, {len(phrases)} phrases)")
+
+
+TTS_CACHE = PhraseCache()
@@ -0,0 +1,70 @@
+import numpy as np
+from collections import deque
+
+from config import Config
+
+END = "end"  # utterance finished: flush the recognizer
+
+
+class EnergyVAD:
+    # RMS energy against an adaptive noise floor, with pre-roll (so word onsets survive) and hangover
+    # (so short pauses inside a command do not split it). The floor keeps adapting, slowly, inside speech
+    # and utterances are capped in length, so steady fan or TV noise cannot hold the gate open.
+    def __init__(self, rate=16000):
+        self.frame_bytes = int(rate * Config.VAD_FRAME_MS / 1000) * 2
+        self.buf = bytearray()
+        self.preroll = deque(maxlen=Config.VAD_PREROLL_FRAMES)
+        self.noise = Config.VAD_MIN_RMS
+        self.in_speech = False
+        self.hang = 0
+        self.length = 0
+        self.forced = 0
+        self.frames = 0
+        self.voiced = 0
+
+    def reset(self):
+        self.buf.clear()
+        self.preroll.clear()
+        self.in_speech = False
+        self.hang = 0
+        self.length = 0
+
+    def process(self, data):
+        # Returns a list of PCM byte strings to decode, with END marking the close of an utterance
+        self.buf += data
+        n = len(self.buf) // self.frame_bytes
+        if not n: return []
+        block = bytes(self.buf[:n * self.frame_bytes])
+        del self.buf[:n * self.frame_bytes]
+
+        x = np.frombuffer(block, dtype=np.int16).astype(np.float32).reshape(n, -1)
+        rms = np.sqrt(np.mean(x * x, axis=1))
+        out = []
+        for i, level in enumerate(rms.tolist()):
+            frame = block[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            self.frames += 1
+            if level > max(Config.VAD_MIN_RMS, self.noise * Config.VAD_RATIO):
+                self.voiced += 1
+                if not self.in_speech:
+                    self.in_speech = True
+                    out.extend(self.preroll)
+                    self.preroll.clear()
+                self.hang = Config.VAD_HANGOVER_FRAMES
+                out.append(frame)
+            elif self.in_speech:
+                out.append(frame)
+                self.hang -= 1
+            if self.in_speech:
+                self.length += 1
+                self.noise += Config.VAD_SPEECH_NOISE_ALPHA * (level - self.noise)
+                if self.length >= Config.VAD_MAX_UTTERANCE_FRAMES:
+                    self.forced += 1
+                    self.hang = 0
+                if self.hang <= 0:
+                    self.in_speech = False
+                    self.length = 0
+                    out.append(END)
+            else:
+                self.noise += Config.VAD_NOISE_ALPHA * (level - self.noise)
+                self.preroll.append(frame)
+        return out
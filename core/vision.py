@@ -1,72 +1,23 @@
 import cv2
 import time
-import numpy as np
 import face_recognition
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 
 from config import Config
 import state
 import core.ai as ai
 from core.audio import speak
-from core.hardware import control_light_hw
-
-
-class ObjectTracker:
-    def __init__(self):
-        self.tracked_objects = {}
-        self.face_regions = []
-
-    def set_face_regions(self, face_boxes):
-        self.face_regions = face_boxes
-
-    def get_centroid(self, box):
-        return int((box[0] + box[2]) / 2), int((box[1] + box[3]) / 2)
-
-    def is_in_face_region(self, box):
-        if not Config.FACE_PRIORITY or not self.face_regions: return False
-        x1, y1, x2, y2 = box
-        for fx1, fy1, fx2, fy2 in self.face_regions:
-            if not (x2 < (fx1 - Config.FACE_REGION_EXPAND) or x1 > (fx2 + Config.FACE_REGION_EXPAND) or y2 < (
-                    fy1 - Config.FACE_REGION_EXPAND) or y1 > (fy2 + Config.FACE_REGION_EXPAND)): return True
-        return False
-
-    def update(self, detections_by_class):
-        current_detections = defaultdict(list)
-        for cls, boxes in detections_by_class.items():
-            if Config.DOG_CLASS_FILTER and cls in Config.ANIMAL_CLASSES:
-                boxes = [b for b in boxes if not self.is_in_face_region(b)]
-            for box in boxes:
-                current_detections[cls].append(self.get_centroid(box))
-
-        new_tracked_objects = defaultdict(list)
-        # ... (existing tracking logic preserved) ...
-        for cls, old_objects in self.tracked_objects.items():
-            for old_obj in old_objects:
-                matched = False
-                if cls in current_detections:
-                    for i, new_cent in enumerate(current_detections[cls]):
-                        distance = np.linalg.norm(np.array(old_obj["centroid"]) - np.array(new_cent))
-                        if distance < Config.SPATIAL_CLUSTERING_DISTANCE:
-                            old_obj["centroid"] = new_cent
-                            old_obj["count"] += 1
-                            old_obj["age"] = 0
-                            new_tracked_objects[cls].append(old_obj)
-                            current_detections[cls].pop(i)
-                            matched = True
-                            break
-                if not matched:
-                    old_obj["age"] += 1
-                    if old_obj["age"] < Config.MAX_TRACK_AGE:
-                        new_tracked_objects[cls].append(old_obj)
-        for cls, new_cents in current_detections.items():
-            for cent in new_cents:
-                new_tracked_objects[cls].append({"centroid": cent, "count": 1, "age": 0})
-        self.tracked_objects = dict(new_tracked_objects)
-
-    def get_stable(self):
-        return {k: [o["centroid"] for o in v if o["count"] >= Config.MIN_FRAMES_STABLE] for k, v in
-                self.tracked_objects.items()}
+from core.speech import HAZARD, SUMMARY, ACK
+from core.capture import get_grabber
+from core.inference import get_engine
+from core.scheduler import ScanScheduler, ConvergenceDetector
+from core.tracker import ObjectTracker
+from core.identity import IDENTITIES
+from core.stream import HUB
+from core.lighting import BrightnessEstimator, boost
+from core.hardware import control_light_hw, LIGHT
+from core.metrics import METRICS
 
 
 def draw_label(frame, label, box, color):
@@ -77,25 +28,46 @@ def draw_label(frame, label, box, color):
     cv2.putText(frame, label, (int(box[0]), text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
 
 
-def rec_face(frame, box):
-    if not ai.KNOWN_FACES['encodings']: return "Unknown"
-    x1, y1, x2, y2 = map(int, box)
-    h, w, _ = frame.shape
-    person_crop = frame[max(0, y1):min(h, y2), max(0, x1):min(w, x2)]
-    if person_crop.size == 0: return "Unknown"
+def rec_faces(frame, boxes, boosted=False):
+    # One face pass per frame: upper part of each person box, downscaled HOG, one batched encode.
+    # Unless the whole frame was already boosted, only the regions that reach dlib are.
+    out = [("Unknown", float("inf"))] * len(boxes)
+    if not len(ai.FACE_INDEX) or not boxes: return out
+    h, w = frame.shape[:2]
+    locations, owners = [], []
     try:
-        rgb = cv2.cvtColor(person_crop, cv2.COLOR_BGR2RGB)
-        face_locations = face_recognition.face_locations(rgb, model="hog")
-        if not face_locations: return "Unknown"
-        encodings = face_recognition.face_encodings(rgb, known_face_locations=face_locations)
-        if encodings:
-            matches = face_recognition.compare_faces(ai.KNOWN_FACES['encodings'], encodings[0],
-                                                     tolerance=Config.FACE_CONF)
-            if True in matches:
-                return ai.KNOWN_FACES['names'][matches.index(True)]
-    except:
-        pass
-    return "Unknown"
+        for i, box in enumerate(boxes):
+            x1, y1, x2, y2 = map(int, box)
+            x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+            y2 = y1 + int((y2 - y1) * Config.FACE_SEARCH_FRACTION)
+            crop = frame[y1:y2, x1:x2]
+            if crop.size == 0: continue
+            scale = min(1.0, Config.FACE_DETECT_WIDTH / crop.shape[1])
+            if scale < 1.0:
+                crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if Config.BRIGHTNESS_BOOST and not boosted: crop = boost(crop)
+            found = face_recognition.face_locations(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB), model="hog")
+            if not found: continue
+            top, right, bottom, left = max(found, key=lambda f: (f[2] - f[0]) * (f[1] - f[3]))
+            locations.append((y1 + int(top / scale), x1 + int(right / scale),
+                              y1 + int(bottom / scale), x1 + int(left / scale)))
+            owners.append(i)
+
+        if not locations: return out
+        # Encode inside the bounding region of all faces rather than converting the whole frame
+        m = 10
+        ry1, rx1 = max(0, min(l[0] for l in locations) - m), max(0, min(l[3] for l in locations) - m)
+        ry2, rx2 = min(h, max(l[2] for l in locations) + m), min(w, max(l[1] for l in locations) + m)
+        roi = frame[ry1:ry2, rx1:rx2]
+        if Config.BRIGHTNESS_BOOST and not boosted: roi = boost(roi)
+        rgb = cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)
+        shifted = [(t - ry1, r - rx1, b - ry1, l - rx1) for t, r, b, l in locations]
+        encodings = face_recognition.face_encodings(rgb, known_face_locations=shifted)
+        for i, match in zip(owners, ai.FACE_INDEX.match_many(encodings)):
+            out[i] = match
+    except Exception as e:
+        print(f"❌ Face stage error: {e}")
+    return out
 
 
 def gen_summary(ppl, objs, light, all_hazards=None, full=False):
@@ -125,91 +97,150 @@ def gen_summary(ppl, objs, light, all_hazards=None, full=False):
     return " ".join(p)
 
 
-def scan_logic(is_auto=False):
-    cap = cv2.VideoCapture(Config.CAM_SOURCE)
-    if not cap.isOpened():
-        print("❌ Cam offline")
-        speak("Camera offline.") if not is_auto else None
-        return
+def scan_logic(is_auto=False, job=None):
+    # Run through core.jobs.SCANS; `job` carries cancel/stop requests and receives progress
+    grabber = get_grabber()
+    first = grabber.latest() or grabber.wait_newer(0, timeout=Config.CAM_CONNECT_TIMEOUT)
+    if first is None:
+        speak("Camera offline.", ACK) if not is_auto else None
+        raise RuntimeError("Camera offline")
 
     print(f"👀 Scanning...")
     tracker = ObjectTracker()
-    p_ids = {}
+    seen_tids = set()
+    IDENTITIES.prune()
     fc = 0
+    last_id = first[0] - 1
     start = time.time()
     all_hazards_seen_this_scan = set()
+    engine = get_engine()
+    sched = ScanScheduler()
+    conv = ConvergenceDetector()
+    bright = BrightnessEstimator()
+    in_flight = deque()
+
+    def handle(item):
+        future, boosted = item
+        with METRICS.stage("inference_wait"):
+            res = future.result()
+        for tag, sec in res.timings.items():
+            METRICS.observe("aether_stage_seconds", sec, stage=f"yolo_{tag}")
+        frame = res.frame
+        dets = defaultdict(list)
+        face_check = sched.face_due()
+
+        people = [d for d in res.detections
+                  if d.model == "std" and d.name in Config.PERSON_ALIASES and d.track_id is not None]
+        for d in people:
+            IDENTITIES.observe(d.track_id, d.box)
+            seen_tids.add(d.track_id)
+        to_check = [d for d in people if IDENTITIES.needs_check(d.track_id, face_check)]
+        if to_check:
+            with METRICS.stage("faces"):
+                for d, (pid, dist) in zip(to_check, rec_faces(frame, [d.box for d in to_check], boosted)):
+                    IDENTITIES.add(d.track_id, pid, dist)
+        f_boxes = [d.box for d in people if IDENTITIES.label(d.track_id) != "Unknown"]
+
+        # Annotate only if someone will see it: the local window or a /stream subscriber
+        annotate = not Config.HEADLESS or HUB.active
+        with METRICS.stage("draw"):
+            if annotate and not boosted: frame = frame.copy()  # never draw on the grabber's shared buffer
+            for d in res.detections:
+                if d.model == "std" and d.name in Config.PERSON_ALIASES and d.track_id is not None:
+                    if annotate: draw_label(frame, IDENTITIES.label(d.track_id), d.box, (0, 255, 0))
+                else:
+                    dets[d.name].append(d.box)
+                    if annotate: draw_label(frame, d.name, d.box, (255, 0, 0) if d.model == "std" else (0, 0, 255))
+
+        current_hazards = {k for k in dets if k in Config.HAZARD_LIST}
+        if current_hazards:
+            all_hazards_seen_this_scan.update(current_hazards)
+            if time.time() - state.last_hazard_alert_time > Config.HAZARD_ALERT_COOLDOWN:
+                alert_text = f"ALERT! I see {' and '.join(current_hazards)}."
+                print(f"🚨 {alert_text}")
+                speak(alert_text, HAZARD)
+                state.last_hazard_alert_time = time.time()
+
+        with METRICS.stage("tracker"):
+            tracker.set_face_regions(f_boxes)
+            tracker.update(dets)
+            conv.update(tracker.get_stable(), IDENTITIES, seen_tids, [d.track_id for d in people])
+        sched.frame_done()
+        with METRICS.stage("output"):
+            HUB.publish(frame)
+            if Config.HEADLESS: return True
+            cv2.imshow("AetherEye", frame)
+            return not (cv2.waitKey(1) & 0xFF == ord('q'))
 
     try:
-        while time.time() - start < Config.SCAN_DURATION:
-            suc, frame = cap.read()
-            if not suc: time.sleep(0.1); continue
+        while True:
+            elapsed, quick = time.time() - start, job is not None and job.quick
+            reason = conv.done(elapsed, quick)
+            if reason is not None:
+                if job is not None: job.stop(reason)
+                break
+            if job is not None:
+                if job.should_stop(): break
+                job.report(elapsed / conv.limits(quick)[1], fc)
+            t0 = time.perf_counter()
+            item = grabber.wait_newer(last_id, timeout=0.5)
+            if item is None: continue
+            METRICS.observe("aether_stage_seconds", time.perf_counter() - t0, stage="capture")
+            last_id, ts, frame = item
             fc += 1
-
-            if Config.BRIGHTNESS_BOOST:
-                frame = cv2.convertScaleAbs(frame, alpha=Config.BRIGHTNESS_ALPHA, beta=Config.BRIGHTNESS_BETA)
-
-            # Light Logic
-            nl = np.mean(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)[:, :, 2]) < Config.LIGHT_THRESHOLD
-            if state.auto_light_active and nl != state.esp_l and (
+            static = sched.static
+            if not sched.should_process(last_id, ts, frame):
+                if sched.static > static: conv.tick()
+                continue
+
+            # Light Logic (strided sample + EMA/hysteresis, no full-frame passes)
+            with METRICS.stage("brightness"):
+                nl = bright.update(frame)
+            if state.auto_light_active and nl != LIGHT.desired and (
                     time.time() - state.last_l > Config.LIGHT_SWITCH_COOLDOWN):
-                control_light_hw(nl)
-                state.esp_l, state.last_l = nl, time.time()
+                control_light_hw(nl)  # queued; never blocks the frame loop
+                state.last_l = time.time()
             if state.esp_l is None: state.esp_l = nl
 
-            dets = defaultdict(list)
-            f_boxes = []
-
-            # Standard Model
-            if ai.yolo_std:
-                results = ai.yolo_std.track(frame, persist=True, classes=ai.STD_CLASSES_ID, conf=Config.STD_CONF,
-                                            verbose=False)
-                for b in results[0].boxes:
-                    n, box = ai.yolo_std.names[int(b.cls[0])], b.xyxy[0].cpu().numpy().tolist()
-                    if n in Config.PERSON_ALIASES and b.id is not None:
-                        tid = int(b.id[0])
-                        if tid not in p_ids or fc % 15 == 0:
-                            pid = rec_face(frame, box)
-                            p_ids[tid] = pid
-                            if pid != "Unknown": f_boxes.append(box)
-                        draw_label(frame, p_ids[tid], box, (0, 255, 0))
-                    else:
-                        dets[n].append(box)
-                        draw_label(frame, n, box, (255, 0, 0))
-
-            # Custom Model
-            if ai.yolo_custom:
-                results = ai.yolo_custom.track(frame, persist=True, conf=Config.CUSTOM_CONF, verbose=False)
-                for b in results[0].boxes:
-                    n, box = ai.yolo_custom.names[int(b.cls[0])], b.xyxy[0].cpu().numpy().tolist()
-                    dets[n].append(box)
-                    draw_label(frame, n, box, (0, 0, 255))
-
-            current_hazards = {k for k in dets if k in Config.HAZARD_LIST}
-            if current_hazards:
-                all_hazards_seen_this_scan.update(current_hazards)
-                if time.time() - state.last_hazard_alert_time > Config.HAZARD_ALERT_COOLDOWN:
-                    alert_text = f"ALERT! I see {' and '.join(current_hazards)}."
-                    print(f"🚨 {alert_text}")
-                    speak(alert_text)
-                    state.last_hazard_alert_time = time.time()
+            # Only dim scenes get a full-frame boost for the detectors; face crops are boosted on demand
+            boosted = bright.dim
+            if boosted:
+                with METRICS.stage("boost"):
+                    frame = boost(frame)
 
-            tracker.set_face_regions(f_boxes)
-            tracker.update(dets)
-            cv2.imshow("AetherEye", frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'): break
+            # Keep a frame in flight while the previous result is handled; the engine batches if we lag
+            in_flight.append((engine.submit(last_id, frame), boosted))
+            if len(in_flight) < Config.INFERENCE_PIPELINE_DEPTH: continue
+            if not handle(in_flight.popleft()): break
+
+        while in_flight:
+            handle(in_flight.popleft())
     finally:
-        cap.release()
-        cv2.destroyAllWindows()
+        if not Config.HEADLESS: cv2.destroyAllWindows()
+
+    if job is not None and job.cancelled:
+        print("🛑 Scan cancelled")
+        return None
 
+    frames = sched.stats()
+    for outcome in ("processed", "static", "dropped"):
+        METRICS.inc("aether_frames_total", frames[outcome], outcome=outcome)
+    print(f"📊 Frames: {fc} read, {frames['processed']} processed, {frames['static']} static, "
+          f"{frames['dropped']} dropped in {time.time() - start:.1f}s")
     stable_objects = tracker.get_stable()
-    summ = gen_summary(list(set(p_ids.values())), stable_objects, not state.esp_l, all_hazards_seen_this_scan,
+    if job is not None: is_auto = job.is_auto  # a manual request may have joined this scan
+    names = list({IDENTITIES.label(t) for t in seen_tids})
+    summ = gen_summary(names, stable_objects, not state.esp_l, all_hazards_seen_this_scan,
                        full=not is_auto)
 
+    result = {
+        "text": summ,
+        "timestamp": datetime.now().strftime("%H:%M:%S"),
+        "light": "on" if not state.esp_l else "off",
+        "frames": frames
+    }
     if summ:
-        state.latest_result = {
-            "text": summ,
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
-            "light": "on" if not state.esp_l else "off"
-        }
+        state.latest_result = result
         print(f"📝 {summ}")
-        speak(summ)
\ No newline at end of file
+        speak(summ, SUMMARY)
+    return result
\ No newline at end of file
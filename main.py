@@ -3,30 +3,76 @@ import time
 import threading
 import uvicorn
 import shutil
-import pickle
-import face_recognition
-from fastapi import FastAPI, UploadFile, BackgroundTasks
+from fastapi import FastAPI, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 
 from config import Config
 import state
 import core.ai as ai
-from core.audio import udp_mic_loop, speak
-from core.hardware import udp_smoke_loop, control_light_hw
-from core.vision import scan_logic
+import core.training as training
+import core.ingest as ingest
+from core.audio import speak, prewarm_tts, SPEECH
+from core.hardware import control_light_hw, delivery_timeout, LIGHT
+from core.capture import get_grabber
+from core.motion import get_gate
+from core.stream import HUB
+from core.speaker import SPEAKER
+from core.jobs import SCANS
+from core.metrics import METRICS, PROFILER
 
 app = FastAPI()
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 
+@app.on_event("startup")
+async def start_udp():
+    await ingest.start()
+
+
 @app.get("/")
 def h(): return {"status": "online"}
 
 
 @app.get("/scan")
-def ms(bg: BackgroundTasks):
-    bg.add_task(scan_logic, is_auto=False)
-    return {"status": "started"}
+def ms(quick: bool = False):
+    job, merged = SCANS.submit(is_auto=False, source="api", quick=quick)
+    return {"status": "merged" if merged else "started", "job": job.id}
+
+
+@app.get("/scan/{job_id}")
+def scan_status(job_id: str):
+    job = SCANS.get(job_id)
+    if job is None: return {"status": "error", "message": "Unknown scan job"}
+    return job.to_dict()
+
+
+@app.api_route("/scan/{job_id}/cancel", methods=["GET", "POST"])
+def scan_cancel(job_id: str):
+    job = SCANS.cancel(job_id)
+    if job is None: return {"status": "error", "message": "Unknown scan job"}
+    return job.to_dict()
+
+
+@app.api_route("/scan/{job_id}/stop", methods=["GET", "POST"])
+def scan_stop(job_id: str):
+    # Finish early but still summarize what has been seen
+    job = SCANS.stop(job_id)
+    if job is None: return {"status": "error", "message": "Unknown scan job"}
+    return job.to_dict()
+
+
+@app.get("/health")
+def health():
+    # Liveness is implied by answering; readiness depends on the models
+    models = ai.MODELS.status()
+    if all(m["state"] == ai.READY for m in models.values()):
+        status = "ready"
+    elif ai.MODELS.ready():
+        status = "degraded"
+    else:
+        status = "loading"
+    return {"status": status, "models": models}
 
 
 @app.get("/status")
@@ -34,14 +80,67 @@ def st():
     return {
         "sentry": state.sentry_active,
         "auto_light": state.auto_light_active,
-        "latest": state.latest_result
+        "light": LIGHT.status(),
+        "latest": state.latest_result,
+        "motion": get_gate().status(),
+        "stream": HUB.status(),
+        "speech": SPEECH.status(),
+        "speaker": SPEAKER.status(),
+        "scans": SCANS.status(),
+        "devices": ingest.status(),
+        "models": ai.MODELS.status()
     }
 
 
+def collect_stats():
+    # Existing per-module stats, exported as Prometheus series only when /metrics is scraped
+    out = []
+    for ip, d in list(ingest.MIC.devices.items()):
+        out.append(("aether_udp_packets_total", "counter", {"stream": "mic", "device": ip}, d.packets))
+    for ip, d in list(ingest.SMOKE.devices.items()):
+        out.append(("aether_udp_packets_total", "counter", {"stream": "smoke", "device": ip}, d.packets))
+    spk = SPEAKER.status()
+    out.append(("aether_udp_packets_total", "counter", {"stream": "speaker"}, spk["packets"]))
+    out.append(("aether_speaker_late_total", "counter", {}, spk["late"]))
+    out.append(("aether_speaker_underruns_total", "counter", {}, spk["underruns"]))
+    out.append(("aether_speech_queue_depth", "gauge", {}, SPEECH.status()["depth"]))
+    out.append(("aether_scans_active", "gauge", {}, len(SCANS.status()["active"])))
+    out.append(("aether_light_failures_total", "counter", {}, LIGHT.status()["failures"]))
+    for name, m in ai.MODELS.status().items():
+        out.append(("aether_model_ready", "gauge", {"model": name}, m["state"] == ai.READY))
+    return out
+
+
+METRICS.add_collector(collect_stats)
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/profile")
+def profile():
+    # Collapsed stacks ("thread;outer;...;inner count"), ready for flamegraph.pl or speedscope
+    return PlainTextResponse(PROFILER.collapsed())
+
+
+@app.api_route("/profile/{action}", methods=["GET", "POST"])
+def profile_control(action: str):
+    PROFILER.start() if action == "on" else PROFILER.stop()
+    return PROFILER.status()
+
+
+@app.get("/stream")
+async def stream():
+    return StreamingResponse(HUB.mjpeg(), media_type="multipart/x-mixed-replace; boundary=frame")
+
+
 @app.api_route("/light/{a}", methods=["GET", "POST"])
 def lc(a: str):
-    success = control_light_hw(a == "on")
-    return {"status": "ok" if success else "err", "light": a}
+    control_light_hw(a == "on", force=True)  # manual commands always reach the device, even if it rebooted
+    success = LIGHT.wait_confirmed(a == "on", timeout=delivery_timeout())
+    return {"status": "ok" if success else "err", "light": a, "device": LIGHT.status()}
 
 
 @app.api_route("/sentry/{action}", methods=["GET", "POST"])
@@ -92,52 +191,43 @@ def delete_face(name: str):
 @app.post("/train")
 def train_faces():
     print("🧠 Starting Training Process...")
-    new_encodings = []
-    new_names = []
     if not os.path.exists(Config.KNOWN_FACES_DIR):
         return {"status": "error", "message": "No known_faces folder found"}
 
-    for person_name in os.listdir(Config.KNOWN_FACES_DIR):
-        person_dir = os.path.join(Config.KNOWN_FACES_DIR, person_name)
-        if not os.path.isdir(person_dir): continue
-
-        print(f"📂 Processing folder: {person_name}")
-        for file_name in os.listdir(person_dir):
-            if file_name.lower().endswith(('.jpg', '.jpeg', '.png')):
-                image_path = os.path.join(person_dir, file_name)
-                try:
-                    img = face_recognition.load_image_file(image_path)
-                    encs = face_recognition.face_encodings(img)
-                    if len(encs) > 0:
-                        new_encodings.append(encs[0])
-                        new_names.append(person_name)
-                except Exception as e:
-                    print(f"  ❌ Error: {e}")
-
-    data = {"encodings": new_encodings, "names": new_names}
-    with open(Config.FACE_ENCODINGS_FILE, "wb") as f:
-        pickle.dump(data, f)
-
-    ai.load_models()
-    unique = len(set(new_names))
-    return {"status": "trained", "count": unique, "total_photos": len(new_encodings)}
+    res = training.train_faces()
+    print(f"✅ Trained: {res['encoded']} new, {res['removed']} removed, {res['total_photos']} total")
+    return {"status": "trained", "count": len(res["names"]), "total_photos": res["total_photos"],
+            "encoded": res["encoded"]}
 
 
 def sentry_loop():
+    # Full scans only run when the motion gate fires (or after SENTRY_MAX_IDLE_SEC as a safety net)
+    gate = get_gate()
+    last_scan = time.time()
     while True:
-        if state.sentry_active:
-            print("🛡️ Sentry Scan")
-            scan_logic(is_auto=True)
-        time.sleep(10)
+        if not state.sentry_active:
+            time.sleep(1)
+            last_scan = time.time()
+            continue
+        fired = gate.wait_trigger(timeout=1.0)
+        idle = Config.SENTRY_MAX_IDLE_SEC and time.time() - last_scan > Config.SENTRY_MAX_IDLE_SEC
+        if fired or idle:
+            print(f"🛡️ Sentry Scan ({'motion' if fired else 'idle check'})")
+            job, _ = SCANS.submit(is_auto=True, source="sentry")
+            job.wait()
+            gate.rearm()
+            last_scan = time.time()
 
 
 if __name__ == "__main__":
     print(f"✅ Starting Aether Eye Server on Port {Config.SERVER_PORT}")
     print(f"📡 WROOM IP: {Config.ESP32_WROOM_IP} | CAM IP: {Config.ESP32_CAM_IP}")
 
-    ai.load_models()
+    ai.load_models()  # background; /health reports progress
+    if Config.PROFILER_ENABLED: PROFILER.start()
+    get_grabber()
+    prewarm_tts()
 
-    for t in [sentry_loop, udp_mic_loop, udp_smoke_loop]:
-        threading.Thread(target=t, daemon=True).start()
+    threading.Thread(target=sentry_loop, daemon=True).start()
 
     uvicorn.run(app, host="0.0.0.0", port=Config.SERVER_PORT, log_level="warning")
\ No newline at end of file